@@ -176,6 +176,9 @@ class TranscriptionQueue(Base):
 
     __table_args__ = (
         Index('idx_queue_priority', 'status', 'priority'),
+        # Serves get_next's "WHERE status='pending' ORDER BY priority DESC,
+        # added_to_queue_date" as an index seek, however much history builds up
+        Index('idx_queue_next', status, priority.desc(), added_to_queue_date),
     )
 
     def to_dict(self) -> Dict:
@@ -201,6 +204,10 @@ class DatabaseManager:
     def init_db():
         """Initialize database - create all tables"""
         Base.metadata.create_all(bind=engine)
+        # create_all skips existing tables entirely, so add any newer indexes too
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
         print(f"✅ Database initialized at {DB_PATH}")
 
     @staticmethod
@@ -11,12 +11,10 @@ Requires HuggingFace token with accepted pyannote terms
 import json
 import logging
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Union
 import warnings
 import torch
 import torchaudio
-import tempfile
-import os
 
 # Voice library integration (optional)
 try:
@@ -34,9 +32,6 @@ def _patched_torch_load(*args, **kwargs):
     return _original_torch_load(*args, **kwargs)
 torch.load = _patched_torch_load
 
-# Suppress warnings
-warnings.filterwarnings('ignore')
-
 try:
     from pyannote.audio import Pipeline
     DIARIZATION_AVAILABLE = True
@@ -50,55 +45,6 @@ logger = logging.getLogger(__name__)
 WINDOW_SIZE = 160000
 
 
-def pad_audio_for_diarization(audio_path: Path) -> Optional[Path]:
-    """Pad audio to a round number of window sizes to avoid tensor mismatch errors.
-
-    Pyannote's embedding extraction uses 10-second windows. If the last segment
-    is shorter, torch.vstack fails. This pads the audio with zeros.
-
-    Returns:
-        Path to padded audio file (temporary file), or None if padding not needed
-    """
-    try:
-        waveform, sample_rate = torchaudio.load(str(audio_path))
-
-        # Resample to 16kHz if needed (pyannote expects 16kHz)
-        if sample_rate != 16000:
-            resampler = torchaudio.transforms.Resample(sample_rate, 16000)
-            waveform = resampler(waveform)
-            sample_rate = 16000
-
-        # Convert to mono if stereo
-        if waveform.shape[0] > 1:
-            waveform = waveform.mean(dim=0, keepdim=True)
-
-        # Calculate padding needed
-        current_length = waveform.shape[1]
-        remainder = current_length % WINDOW_SIZE
-
-        if remainder == 0:
-            logger.info("Audio length is already aligned, no padding needed")
-            return None
-
-        padding_needed = WINDOW_SIZE - remainder
-        logger.info(f"Padding audio with {padding_needed} samples ({padding_needed/16000:.2f}s) to avoid tensor mismatch")
-
-        # Pad with zeros
-        padded_waveform = torch.nn.functional.pad(waveform, (0, padding_needed))
-
-        # Save to temporary file
-        temp_dir = tempfile.gettempdir()
-        temp_path = Path(temp_dir) / f"diarization_padded_{audio_path.stem}.wav"
-        torchaudio.save(str(temp_path), padded_waveform, sample_rate)
-
-        logger.info(f"Created padded audio: {temp_path}")
-        return temp_path
-
-    except Exception as e:
-        logger.warning(f"Failed to pad audio: {e}")
-        return None
-
-
 class SpeakerDiarizer:
     """Handles speaker diarization for podcast episodes"""
 
@@ -152,10 +98,13 @@ class SpeakerDiarizer:
         try:
             logger.info("Loading speaker diarization pipeline...")
             # Use the latest pyannote speaker diarization model
-            self.pipeline = Pipeline.from_pretrained(
-                "pyannote/speaker-diarization-3.1",
-                use_auth_token=self.hf_token
-            )
+            # (scoped so pyannote's noise doesn't silence warnings process-wide)
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                self.pipeline = Pipeline.from_pretrained(
+                    "pyannote/speaker-diarization-3.1",
+                    use_auth_token=self.hf_token
+                )
 
             # Enable M4 GPU acceleration (MPS on Apple Silicon)
             if torch.backends.mps.is_available():
@@ -170,8 +119,52 @@ class SpeakerDiarizer:
             logger.error("Make sure you've accepted the terms at: https://huggingface.co/pyannote/speaker-diarization-3.1")
             raise
 
+    def _prepare_audio(self, audio_path: Path) -> Union[Dict, str]:
+        """Decode audio once into a pyannote-ready in-memory dict.
+
+        Resamples to 16kHz mono and pads with zeros to a round number of
+        10-second windows: pyannote's embedding extraction fails in
+        torch.vstack when the last window is shorter. The same dict is reused
+        for voice library identification, so the file is never decoded twice.
+
+        Returns:
+            {"waveform": tensor of shape (1, num_samples), "sample_rate": 16000},
+            or the file path as a string if decoding fails (pyannote then
+            reads the file itself)
+        """
+        try:
+            return self._decode_padded(audio_path)
+        except Exception as e:
+            logger.warning(f"Failed to decode audio in memory: {e}")
+            return str(audio_path)
+
+    def _decode_padded(self, audio_path: Path) -> Dict:
+        waveform, sample_rate = torchaudio.load(str(audio_path))
+
+        # Resample to 16kHz if needed (pyannote expects 16kHz)
+        if sample_rate != 16000:
+            resampler = torchaudio.transforms.Resample(sample_rate, 16000)
+            waveform = resampler(waveform)
+
+        # Convert to mono if stereo
+        if waveform.shape[0] > 1:
+            waveform = waveform.mean(dim=0, keepdim=True)
+
+        remainder = waveform.shape[1] % WINDOW_SIZE
+        if remainder:
+            padding_needed = WINDOW_SIZE - remainder
+            logger.info(f"Padding audio with {padding_needed} samples ({padding_needed/16000:.2f}s) to avoid tensor mismatch")
+            waveform = torch.nn.functional.pad(waveform, (0, padding_needed))
+
+        # Resampling can leave a strided view; hand pyannote one contiguous float32
+        # buffer so its Audio wrapper doesn't silently copy it again
+        waveform = waveform.contiguous()
+        assert waveform.dtype == torch.float32 and waveform.shape[0] == 1
+
+        return {"waveform": waveform, "sample_rate": 16000}
+
     def diarize(self, audio_path: Path, num_speakers: Optional[int] = None,
-                progress_callback=None) -> Dict:
+                progress_callback=None, audio_in: Optional[Union[Dict, str]] = None) -> Dict:
         """Run speaker diarization on an audio file
 
         Args:
@@ -179,6 +172,7 @@ class SpeakerDiarizer:
             num_speakers: Expected number of speakers (None = auto-detect)
                          For Ice Cream Social: 2 (Matt & Mattingly) or 3+ with guests
             progress_callback: Optional callback for progress updates
+            audio_in: Optional output of _prepare_audio() (avoids a second decode)
 
         Returns:
             Dictionary with speaker segments:
@@ -200,9 +194,8 @@ class SpeakerDiarizer:
         logger.info(f"Running speaker diarization on: {audio_path.name}")
         print(f"DIARIZATION_PROGRESS: 0", flush=True)
 
-        # Preprocess audio to avoid tensor size mismatch errors
-        padded_audio_path = pad_audio_for_diarization(audio_path)
-        processing_path = padded_audio_path if padded_audio_path else audio_path
+        if audio_in is None:
+            audio_in = self._prepare_audio(audio_path)
 
         try:
             # Hook for progress updates during diarization
@@ -211,13 +204,15 @@ class SpeakerDiarizer:
                     progress = int((completed / total) * 100)
                     print(f"DIARIZATION_PROGRESS: {progress}", flush=True)
 
-            # Run diarization with progress hook using padded audio
+            # Run diarization with progress hook on the in-memory padded audio
             diarization = None
             try:
-                if num_speakers:
-                    diarization = self.pipeline(str(processing_path), num_speakers=num_speakers, hook=hook)
-                else:
-                    diarization = self.pipeline(str(processing_path), hook=hook)
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore')
+                    if num_speakers:
+                        diarization = self.pipeline(audio_in, num_speakers=num_speakers, hook=hook)
+                    else:
+                        diarization = self.pipeline(audio_in, hook=hook)
             except RuntimeError as e:
                 if "Sizes of tensors must match" in str(e):
                     logger.warning(f"Tensor size mismatch even with padding: {e}")
@@ -231,29 +226,29 @@ class SpeakerDiarizer:
                     }
                 else:
                     raise
-            finally:
-                # Clean up padded audio file
-                if padded_audio_path and padded_audio_path.exists():
-                    try:
-                        os.remove(padded_audio_path)
-                        logger.debug(f"Cleaned up padded audio: {padded_audio_path}")
-                    except Exception:
-                        pass
 
             # Extract speaker information
-            speakers = set()
+            # Pyannote labels are SPEAKER_00..SPEAKER_NN, so track which ones
+            # appear as bits of an int instead of hashing every turn into a set
+            speaker_mask = 0
             segments = []
 
             for turn, _, speaker in diarization.itertracks(yield_label=True):
-                speakers.add(speaker)
+                speaker_mask |= 1 << int(speaker.rsplit('_', 1)[1])
                 segments.append({
                     'start': turn.start,
                     'end': turn.end,
                     'speaker': speaker
                 })
 
+            speakers = [
+                f"SPEAKER_{i:02d}"
+                for i in range(speaker_mask.bit_length())
+                if speaker_mask >> i & 1
+            ]
+
             result = {
-                'speakers': sorted(list(speakers)),
+                'speakers': speakers,
                 'num_speakers': len(speakers),
                 'segments': segments,
                 'total_segments': len(segments)
@@ -268,13 +263,18 @@ class SpeakerDiarizer:
             raise
 
     def identify_speakers(self, diarization: Dict, audio_path: Path,
-                          episode_date: Optional[str] = None) -> Dict[str, Dict]:
+                          episode_date: Optional[str] = None,
+                          waveform: Optional[torch.Tensor] = None,
+                          sample_rate: int = 16000) -> Dict[str, Dict]:
         """Identify diarization speakers using voice library
 
         Args:
             diarization: Output from diarize()
             audio_path: Path to original audio file
             episode_date: ISO date string of episode (for era-weighted matching)
+            waveform: Optional pre-loaded mono waveform; when given, the voice
+                      library uses it instead of decoding audio_path again
+            sample_rate: Sample rate of waveform
 
         Returns:
             Mapping of diarization labels to speaker info with confidence
@@ -290,8 +290,13 @@ class SpeakerDiarizer:
             def voice_id_progress(pct: int) -> None:
                 print(f"VOICE_ID_PROGRESS: {pct}", flush=True)
 
+            if waveform is not None:
+                audio_in = {"waveform": waveform, "sample_rate": sample_rate}
+            else:
+                audio_in = audio_path
+
             mapping = self.voice_library.identify_speakers_in_diarization(
-                diarization, audio_path, return_scores=True, episode_date=episode_date,
+                diarization, audio_in, return_scores=True, episode_date=episode_date,
                 progress_callback=voice_id_progress,
             )
             print("VOICE_ID_PROGRESS: 100", flush=True)
@@ -514,12 +519,18 @@ def process_episode(audio_path: Path, transcript_path: Path, hf_token: str,
         voice_store_mode=voice_store_mode,
         voice_db_path=voice_db_path,
     )
-    diarization = diarizer.diarize(audio_path, num_speakers=num_speakers)
+    # Decode once: the same waveform feeds diarization and voice identification
+    audio_in = diarizer._prepare_audio(audio_path)
+    diarization = diarizer.diarize(audio_path, num_speakers=num_speakers, audio_in=audio_in)
 
     # Identify speakers using voice library (if available)
     speaker_mapping = {}
     if use_voice_library and diarizer.voice_library:
-        speaker_mapping = diarizer.identify_speakers(diarization, audio_path, episode_date=episode_date)
+        preloaded = audio_in if isinstance(audio_in, dict) else {}
+        speaker_mapping = diarizer.identify_speakers(
+            diarization, audio_path, episode_date=episode_date,
+            waveform=preloaded.get("waveform"), sample_rate=preloaded.get("sample_rate", 16000),
+        )
 
     # Align with transcript
     enhanced_transcript = diarizer.align_with_transcript(
@@ -12,17 +12,47 @@ Based on show format:
 """
 
 import re
+from bisect import bisect_right
+from collections import defaultdict
 from typing import Dict, List, Optional
 import logging
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+_REGEX_META = frozenset(".^$*+?{}[]\\|()")
+
+# Joins segment texts for whole-transcript scans. '.' stops at the newlines and
+# no pattern matches NUL, so a match can never straddle two segments.
+_SEGMENT_SEP = "\n\x00\n"
+
+
+def _literal_variants(pattern: str) -> Optional[List[str]]:
+    """Expand a pattern into the plain phrases it matches, or None if it needs regex.
+
+    Only the optional apostrophe (``i'?m`` -> ``i'm`` / ``im``) is flattened;
+    anything else with regex syntax stays on the regex path.
+    """
+    if "'?" in pattern:
+        variants = [pattern.replace("'?", "'"), pattern.replace("'?", "")]
+    else:
+        variants = [pattern]
+    if any(ch in _REGEX_META for variant in variants for ch in variant):
+        return None
+    return [variant.lower() for variant in variants]
+
 
 class SpeakerPatternMatcher:
     """Identifies speakers using catchphrases and intro patterns"""
 
     # Known catchphrases and patterns
     # These identify the SPEAKER (not who they're talking about)
+    # Patterns are matched against lowercased text, so keep them lowercase
     SPEAKER_PATTERNS = {
         "Jacob": [
             r"oh hello there",
@@ -45,6 +75,10 @@ class SpeakerPatternMatcher:
         ]
     }
 
+    # Cheap substring check before any regex: every SPEAKER_PATTERNS entry
+    # contains at least one of these, so keep it in sync when adding patterns
+    PREFILTER = ("matt", "paul", "jacob", "hello")
+
     # Intro sequence patterns
     INTRO_SEQUENCE = [
         {
@@ -76,43 +110,195 @@ class SpeakerPatternMatcher:
         }
     ]
 
+    # Position bonus per segment index, indexed by intro position
+    POS_BONUS_TABLE = {
+        "first": [0.3] * 5 + [0.0] * 15,
+        "second": [0.0] * 4 + [0.2] * 6 + [0.0] * 10,
+        "third": [0.0] * 6 + [0.2] * 9 + [0.0] * 5,
+    }
+
+    # Compiled state, built once per class and shared by every instance
+    # (and by forked worker processes)
+    _compiled = False
+    compiled_patterns = {}
+    union_patterns = {}
+    compiled_intro = []
+    automaton = None
+    fallback_catchphrases = []
+    fallback_intro = []
+
     def __init__(self):
         """Initialize pattern matcher"""
-        self.compiled_patterns = {}
-        self._compile_patterns()
-
-    def _compile_patterns(self):
+        self._ensure_compiled()
+
+    @classmethod
+    def _ensure_compiled(cls):
+        """Compile the pattern tables on first use for this class"""
+        # Check the class's own dict so subclasses with their own tables compile too
+        if cls.__dict__.get('_compiled'):
+            return
+        cls._compile_patterns()
+        if AHOCORASICK_AVAILABLE:
+            cls._build_automaton()
+        cls._compiled = True
+
+    @classmethod
+    def _compile_patterns(cls):
         """Pre-compile regex patterns for efficiency"""
-        for speaker, patterns in self.SPEAKER_PATTERNS.items():
-            self.compiled_patterns[speaker] = [
-                re.compile(pattern, re.IGNORECASE) for pattern in patterns
+        cls.compiled_patterns = {}
+        cls.union_patterns = {}
+        for speaker, patterns in cls.SPEAKER_PATTERNS.items():
+            cls.compiled_patterns[speaker] = [
+                re.compile(pattern) for pattern in patterns
             ]
+            # One alternation per speaker so the engine walks the text once
+            cls.union_patterns[speaker] = re.compile(
+                "|".join(f"(?:{pattern})" for pattern in patterns)
+            )
+
+        cls.compiled_intro = [
+            {
+                "speaker": intro["speaker"],
+                "position": intro["position"],
+                "patterns": [re.compile(pattern) for pattern in intro["patterns"]],
+            }
+            for intro in cls.INTRO_SEQUENCE
+        ]
 
-    def identify_by_catchphrase(self, text: str) -> Optional[str]:
+    @classmethod
+    def _build_automaton(cls):
+        """Index every literal phrase from both pattern tables in one automaton
+
+        Each phrase maps to the (group, pattern index) tags it satisfies, where
+        group is a SPEAKER_PATTERNS name or an INTRO_SEQUENCE index, so a single
+        pass over a segment yields both catchphrase and intro hits. Patterns
+        that need real regex syntax are kept as compiled fallbacks.
+        """
+        cls.fallback_catchphrases = []
+        cls.fallback_intro = []
+        tables = [(speaker, patterns, cls.fallback_catchphrases)
+                  for speaker, patterns in cls.SPEAKER_PATTERNS.items()]
+        tables += [(idx, intro['patterns'], cls.fallback_intro)
+                   for idx, intro in enumerate(cls.INTRO_SEQUENCE)]
+
+        phrases = {}
+        for group, patterns, fallback in tables:
+            for pattern_idx, pattern in enumerate(patterns):
+                tag = (group, pattern_idx)
+                variants = _literal_variants(pattern)
+                if variants is None:
+                    fallback.append((tag, re.compile(pattern)))
+                    continue
+                for phrase in variants:
+                    phrases.setdefault(phrase, []).append(tag)
+
+        automaton = ahocorasick.Automaton()
+        for phrase, tags in phrases.items():
+            automaton.add_word(phrase, tags)
+        automaton.make_automaton()
+        cls.automaton = automaton
+
+    def _scan(self, text_lower: str, fallback: List) -> set:
+        """Return the (group, pattern index) tags matched in lowercased text"""
+        hits = set()
+        for _, tags in self.automaton.iter(text_lower):
+            hits.update(tags)
+        for tag, pattern in fallback:
+            if pattern.search(text_lower):
+                hits.add(tag)
+        return hits
+
+    def identify_by_catchphrase(self, text_lower: str) -> Optional[str]:
         """Identify speaker by catchphrase in text
 
         Args:
-            text: Segment text to analyze
+            text_lower: Segment text to analyze, already lowercased
 
         Returns:
             Speaker name if identified, None otherwise
         """
-        text_lower = text.lower()
-
-        for speaker, patterns in self.compiled_patterns.items():
-            for pattern in patterns:
-                if pattern.search(text_lower):
+        # Most segments mention nobody; skip the pattern engines for them
+        if not any(word in text_lower for word in self.PREFILTER):
+            return None
+
+        if self.automaton is not None:
+            matched = self._scan(text_lower, self.fallback_catchphrases)
+            # Keep SPEAKER_PATTERNS order as the tie-break, like the regex path
+            for speaker, patterns in self.SPEAKER_PATTERNS.items():
+                for pattern_idx, pattern in enumerate(patterns):
+                    if (speaker, pattern_idx) in matched:
+                        logger.debug(f"Matched '{speaker}' via pattern: {pattern}")
+                        return speaker
+            return None
+
+        for speaker, union in self.union_patterns.items():
+            if union.search(text_lower):
+                if logger.isEnabledFor(logging.DEBUG):
+                    pattern = next(p for p in self.compiled_patterns[speaker] if p.search(text_lower))
                     logger.debug(f"Matched '{speaker}' via pattern: {pattern.pattern}")
-                    return speaker
+                return speaker
 
         return None
 
-    def analyze_intro_sequence(self, segments: List[Dict], max_segments: int = 20) -> Dict[str, str]:
+    def identify_catchphrases(self, lowers: List[str]) -> List[Optional[str]]:
+        """Identify speakers by catchphrase for many segments at once
+
+        The segment texts are joined and each speaker's union regex (or the
+        automaton) scans the whole transcript once; matches are mapped back
+        to their segment by offset.
+
+        Args:
+            lowers: Lowercased text per segment
+
+        Returns:
+            Speaker name (or None) per segment, same result as calling
+            identify_by_catchphrase() on each text
+        """
+        identified = [None] * len(lowers)
+        if not lowers:
+            return identified
+
+        big_text = _SEGMENT_SEP.join(lowers)
+        if not any(word in big_text for word in self.PREFILTER):
+            return identified
+
+        starts = []
+        offset = 0
+        for text_lower in lowers:
+            starts.append(offset)
+            offset += len(text_lower) + len(_SEGMENT_SEP)
+
+        if self.automaton is not None:
+            hits = defaultdict(set)  # segment index -> matched speakers
+            for end, tags in self.automaton.iter(big_text):
+                idx = bisect_right(starts, end) - 1
+                hits[idx].update(group for group, _ in tags if isinstance(group, str))
+            for (speaker, _), pattern in self.fallback_catchphrases:
+                for match in pattern.finditer(big_text):
+                    hits[bisect_right(starts, match.start()) - 1].add(speaker)
+            # Keep SPEAKER_PATTERNS order as the tie-break
+            for idx, speakers in hits.items():
+                identified[idx] = next((speaker for speaker in self.SPEAKER_PATTERNS
+                                        if speaker in speakers), None)
+            return identified
+
+        # Earlier speakers win ties, so only fill segments not yet claimed
+        for speaker, union in self.union_patterns.items():
+            for match in union.finditer(big_text):
+                idx = bisect_right(starts, match.start()) - 1
+                if identified[idx] is None:
+                    identified[idx] = speaker
+
+        return identified
+
+    def analyze_intro_sequence(self, segments: List[Dict], max_segments: int = 20,
+                               lowers: Optional[List[str]] = None) -> Dict[str, str]:
         """Analyze first segments to identify speakers by intro pattern
 
         Args:
             segments: List of transcript segments
             max_segments: Number of initial segments to analyze
+            lowers: Optional lowercased text per segment (computed if omitted)
 
         Returns:
             Dictionary mapping SPEAKER_XX to identified names
@@ -121,49 +307,64 @@ class SpeakerPatternMatcher:
 
         # Analyze first N segments (intro usually happens here)
         intro_segments = segments[:max_segments]
+        if lowers is None:
+            lowers = [segment.get('text', '').lower() for segment in intro_segments]
 
         # Track speaker appearances and patterns
-        speaker_evidence = {}  # SPEAKER_XX -> {speaker_name: confidence_score}
+        speaker_evidence = defaultdict(lambda: defaultdict(float))  # SPEAKER_XX -> {speaker_name: confidence_score}
+        use_automaton = self.automaton is not None
+        all_identified = False
 
         for i, segment in enumerate(intro_segments):
-            text = segment.get('text', '')
+            if all_identified:
+                break
+
+            text_lower = lowers[i]
             speaker_id = segment.get('speaker')
 
             if not speaker_id:
                 continue
 
+            if use_automaton:
+                matched = self._scan(text_lower, self.fallback_intro)
+            evidence = speaker_evidence[speaker_id]
+
+            # Higher confidence for earlier segments (decreases with segment index)
+            base_confidence = 1.0 - (i * 0.05)
+
             # Check against intro sequence patterns
-            for intro_pattern in self.INTRO_SEQUENCE:
+            for intro_idx, intro_pattern in enumerate(self.compiled_intro):
                 speaker_name = intro_pattern['speaker']
                 patterns = intro_pattern['patterns']
-                position = intro_pattern['position']
+                bonus = self.POS_BONUS_TABLE[intro_pattern['position']]
+
+                # Bonus for matching expected position
+                confidence = base_confidence + (bonus[i] if i < len(bonus) else 0.0)
 
                 # Check if text matches any pattern
-                for pattern in patterns:
-                    if re.search(pattern, text, re.IGNORECASE):
-                        # Found a match!
-                        if speaker_id not in speaker_evidence:
-                            speaker_evidence[speaker_id] = {}
-
-                        # Higher confidence for earlier segments
-                        confidence = 1.0 - (i * 0.05)  # Decreases with segment index
-
-                        # Bonus for matching expected position
-                        if position == "first" and i < 5:
-                            confidence += 0.3
-                        elif position == "second" and 3 < i < 10:
-                            confidence += 0.2
-                        elif position == "third" and 5 < i < 15:
-                            confidence += 0.2
-
-                        # Add evidence
-                        if speaker_name in speaker_evidence[speaker_id]:
-                            speaker_evidence[speaker_id][speaker_name] += confidence
-                        else:
-                            speaker_evidence[speaker_id][speaker_name] = confidence
+                for pattern_idx, pattern in enumerate(patterns):
+                    if use_automaton:
+                        hit = (intro_idx, pattern_idx) in matched
+                    else:
+                        hit = pattern.search(text_lower)
+                    if hit:
+                        # Found a match! Add evidence
+                        evidence[speaker_name] += confidence
 
                         logger.debug(f"Intro pattern match: {speaker_id} -> {speaker_name} (confidence: {confidence:.2f})")
 
+                        # Stop scanning once every intro speaker is confidently placed
+                        confident = {
+                            max(scores, key=scores.get)
+                            for scores in speaker_evidence.values()
+                            if scores and max(scores.values()) > 0.8
+                        }
+                        if len(confident) >= len(self.INTRO_SEQUENCE):
+                            all_identified = True
+                            break
+                if all_identified:
+                    break
+
         # Convert evidence to final mapping (pick highest confidence)
         for speaker_id, evidence in speaker_evidence.items():
             if evidence:
@@ -187,42 +388,39 @@ class SpeakerPatternMatcher:
         """
         segments = transcript.get('segments', [])
 
+        # Lowercase each segment once; both passes match against these
+        lowers = [segment.get('text', '').lower() for segment in segments]
+
         # 1. Analyze intro sequence to establish baseline mapping
-        intro_mapping = self.analyze_intro_sequence(segments)
+        intro_mapping = self.analyze_intro_sequence(segments, lowers=lowers)
 
         logger.info(f"Intro analysis found: {intro_mapping}")
 
-        # 2. Apply intro mapping to all segments
-        for segment in segments:
-            speaker_id = segment.get('speaker')
-
-            if speaker_id and speaker_id in intro_mapping:
-                segment['speaker_name_pattern'] = intro_mapping[speaker_id]
-
-        # 3. Look for catchphrases to override/confirm
+        # 2. Single pass: apply intro mapping, then let catchphrases
+        #    (scanned over the whole transcript at once) override/confirm it
         catchphrase_corrections = 0
-        for segment in segments:
-            text = segment.get('text', '')
+        catchphrases = self.identify_catchphrases(lowers)
+        for segment, identified in zip(segments, catchphrases):
+            speaker_id = segment.get('speaker')
 
-            # Check for catchphrases
-            identified = self.identify_by_catchphrase(text)
+            intro_name = intro_mapping.get(speaker_id)
+            if intro_name:
+                segment['speaker_name_pattern'] = intro_name
 
             if identified:
-                speaker_id = segment.get('speaker')
-
                 # If we already have a pattern match, compare
                 if 'speaker_name_pattern' in segment:
                     if segment['speaker_name_pattern'] != identified:
                         logger.warning(
                             f"Catchphrase override: {speaker_id} was {segment['speaker_name_pattern']}, "
-                            f"now {identified} based on '{text[:50]}...'"
+                            f"now {identified} based on '{segment.get('text', '')[:50]}...'"
                         )
                         catchphrase_corrections += 1
 
                 segment['speaker_name_pattern'] = identified
                 segment['identified_by'] = 'catchphrase'
 
-        # 4. Add pattern metadata
+        # 3. Add pattern metadata
         if 'diarization' not in transcript:
             transcript['diarization'] = {}
 
@@ -250,24 +448,27 @@ class SpeakerPatternMatcher:
             Transcript with final speaker names
         """
         segments = transcript.get('segments', [])
+        # Diarization mapping is per transcript, so look it up once
+        mapping = transcript.get('diarization', {}).get('speaker_mapping', {})
 
         for segment in segments:
             # Priority 1: Pattern-matched name
             if 'speaker_name_pattern' in segment:
                 segment['speaker_name'] = segment['speaker_name_pattern']
             # Priority 2: Diarization-based name
-            elif 'speaker_name' not in segment and 'speaker' in segment:
-                # Use diarization mapping if available
-                speaker_id = segment['speaker']
-                if 'diarization' in transcript and 'speaker_mapping' in transcript['diarization']:
-                    mapping = transcript['diarization']['speaker_mapping']
-                    if speaker_id in mapping:
-                        segment['speaker_name'] = mapping[speaker_id]
+            elif mapping and 'speaker_name' not in segment:
+                speaker_id = segment.get('speaker')
+                if speaker_id in mapping:
+                    segment['speaker_name'] = mapping[speaker_id]
 
         logger.info("✅ Merged pattern matching with diarization")
         return transcript
 
 
+# Build the shared tables at import so forked workers inherit them
+SpeakerPatternMatcher._ensure_compiled()
+
+
 def test_pattern_matcher():
     """Test pattern matcher with sample segments"""
 
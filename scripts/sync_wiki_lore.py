@@ -1,5 +1,12 @@
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import ijson
+except ImportError:
+    # Fallback to parsing whole responses if ijson not installed
+    ijson = None
 
 class WikiLoreArchive:
     def __init__(self):
@@ -9,6 +16,12 @@ class WikiLoreArchive:
             "Guests": "Category:Guests",
             "Segments": "Category:Segments"
         }
+        # One keep-alive session so category calls reuse the TLS connection
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Accept-Encoding": "gzip",
+            "User-Agent": "ice-cream-social/1.0"
+        })
 
     def get_category_members(self, category):
         params = {
@@ -18,14 +31,47 @@ class WikiLoreArchive:
             "cmlimit": "max",
             "format": "json"
         }
-        response = requests.get(self.api_url, params=params).json()
-        return [item['title'] for item in response['query'].get('categorymembers', [])]
+        titles = []
+        while True:
+            page_titles, continuation = self._fetch_page(params)
+            titles.extend(page_titles)
+            # MediaWiki caps each page; follow continuation tokens until done
+            if not continuation:
+                return titles
+            params.update(continuation)
+
+    def _fetch_page(self, params):
+        """Return (titles, continue params) for one API page
+
+        With ijson the response is parsed as it streams in and only titles
+        are kept, instead of materializing every categorymember dict.
+        """
+        if ijson is None:
+            response = self.session.get(self.api_url, params=params, timeout=10).json()
+            titles = [item['title'] for item in response['query'].get('categorymembers', [])]
+            return titles, response.get('continue')
+
+        titles = []
+        continuation = {}
+        with self.session.get(self.api_url, params=params, timeout=10, stream=True) as response:
+            response.raw.decode_content = True
+            for prefix, event, value in ijson.parse(response.raw):
+                if prefix == 'query.categorymembers.item.title':
+                    titles.append(value)
+                elif prefix.startswith('continue.') and event == 'string':
+                    continuation[prefix.split('.', 1)[1]] = value
+        return titles, continuation
 
     def build_lore_library(self):
         library = {}
-        for lore_type, category in self.lore_map.items():
-            print(f"Syncing {lore_type}...")
-            library[lore_type] = self.get_category_members(category)
+        with ThreadPoolExecutor(max_workers=len(self.lore_map)) as pool:
+            futures = {
+                lore_type: pool.submit(self.get_category_members, category)
+                for lore_type, category in self.lore_map.items()
+            }
+            for lore_type, future in futures.items():
+                print(f"Syncing {lore_type}...")
+                library[lore_type] = future.result()
         
         with open('wiki_lore_library.json', 'w') as f:
             json.dump(library, f, indent=4)
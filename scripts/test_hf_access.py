@@ -2,15 +2,25 @@
 """Test HuggingFace access to pyannote models"""
 
 import os
+import functools
+from contextlib import contextmanager
+
 import torch
 
-# Fix PyTorch 2.6 weights_only issue - pyannote is a trusted source
-# Monkey-patch torch.load to use weights_only=False
-_original_torch_load = torch.load
-def _patched_torch_load(*args, **kwargs):
-    kwargs.setdefault('weights_only', False)
-    return _original_torch_load(*args, **kwargs)
-torch.load = _patched_torch_load
+
+@contextmanager
+def trust_pyannote_loads():
+    """Temporarily load checkpoints with weights_only=False
+
+    Fixes the PyTorch 2.6 weights_only issue for pyannote (a trusted source)
+    without patching torch.load for the rest of the process.
+    """
+    original_torch_load = torch.load
+    torch.load = functools.partial(original_torch_load, weights_only=False)
+    try:
+        yield
+    finally:
+        torch.load = original_torch_load
 
 from pyannote.audio import Pipeline
 
@@ -27,10 +37,11 @@ print(f"Token: {HF_TOKEN[:10]}...")
 
 try:
     print("\nAttempting to load pipeline...")
-    pipeline = Pipeline.from_pretrained(
-        'pyannote/speaker-diarization-3.1',
-        use_auth_token=HF_TOKEN
-    )
+    with trust_pyannote_loads():
+        pipeline = Pipeline.from_pretrained(
+            'pyannote/speaker-diarization-3.1',
+            use_auth_token=HF_TOKEN
+        )
     print("✅ Successfully loaded pipeline!")
     print(f"Pipeline type: {type(pipeline)}")
 except Exception as e:
@@ -7,6 +7,7 @@ Usage:
     python transcribe.py <audio_file_or_url>
     python transcribe.py episode.mp3
     python transcribe.py --batch episodes/
+    python transcribe.py episode.mp3 --words   # include word timestamps
 
 Requirements:
     pip install faster-whisper feedparser requests tqdm
@@ -17,8 +18,10 @@ import json
 import os
 import sys
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import timedelta
 from pathlib import Path
+from typing import Optional
 
 try:
     from faster_whisper import WhisperModel
@@ -26,6 +29,18 @@ except ImportError:
     print("Please install faster-whisper: pip install faster-whisper")
     sys.exit(1)
 
+try:
+    from faster_whisper import BatchedInferencePipeline
+except ImportError:
+    # Older faster-whisper releases don't ship the batched pipeline
+    BatchedInferencePipeline = None
+
+try:
+    import orjson
+except ImportError:
+    # Fallback to stdlib json if orjson not installed
+    orjson = None
+
 try:
     from tqdm import tqdm
 except ImportError:
@@ -46,7 +61,8 @@ except ImportError:
     print("Warning: Could not load config module. Using defaults.")
     MODEL_SIZE = "large-v3"
     DEVICE = "auto"
-    COMPUTE_TYPE = "auto"
+    # int8 weights halve memory traffic vs float16/float32 with negligible WER loss
+    COMPUTE_TYPE = "int8_float16" if DEVICE in ("cuda", "auto") else "int8"
     OUTPUT_DIR = Path("transcripts")
 
 
@@ -58,31 +74,48 @@ def format_timestamp(seconds: float) -> str:
 def transcribe_audio(
     audio_path: str,
     model: WhisperModel,
-    output_format: str = "all"
+    output_dir: Path,
+    base_name: str,
+    output_format: str = "all",
+    batch_size: Optional[int] = None,
+    word_timestamps: bool = False
 ) -> dict:
     """
-    Transcribe an audio file and return results.
+    Transcribe an audio file, streaming text outputs to disk.
+    
+    The .txt, .srt and .md files are written segment by segment as Whisper
+    yields them, so only the compact segment dicts are kept in memory.
+    Call save_transcript() afterwards to write the JSON.
     
     Args:
         audio_path: Path to audio file
-        model: Loaded WhisperModel
+        model: Loaded WhisperModel (or BatchedInferencePipeline)
+        output_dir: Directory for transcript files
+        base_name: File name (without extension) for transcript files
         output_format: 'text', 'json', 'srt', or 'all'
+        batch_size: Chunks per forward pass when model is a BatchedInferencePipeline
+        word_timestamps: Also compute and store per-word timings (slower, much larger JSON)
     
     Returns:
         dict with transcript data
     """
     print(f"\nTranscribing: {audio_path}")
     start_time = time.time()
+    output_dir.mkdir(parents=True, exist_ok=True)
     
-    # Transcribe with word-level timestamps
+    # Word-level timestamps cost an extra alignment pass, so they are opt-in
+    transcribe_kwargs = {}
+    if batch_size:
+        transcribe_kwargs["batch_size"] = batch_size
     segments, info = model.transcribe(
         audio_path,
         beam_size=5,
-        word_timestamps=True,
+        word_timestamps=word_timestamps,
         vad_filter=True,  # Filter out silence
+        **transcribe_kwargs
     )
     
-    # Convert generator to list and build output
+    # Consume the generator and build output
     transcript_data = {
         "audio_file": str(audio_path),
         "language": info.language,
@@ -91,78 +124,131 @@ def transcribe_audio(
         "segments": []
     }
     
-    full_text_parts = []
-    srt_parts = []
+    txt_path = output_dir / f"{base_name}.txt"
+    srt_path = output_dir / f"{base_name}.srt"
+    md_path = output_dir / f"{base_name}.md"
     
     print("Processing segments...")
-    for i, segment in enumerate(segments):
-        seg_dict = {
-            "id": i,
-            "start": segment.start,
-            "end": segment.end,
-            "text": segment.text.strip(),
-        }
-        
-        # Add word-level timestamps if available
-        if segment.words:
-            seg_dict["words"] = [
-                {"word": w.word, "start": w.start, "end": w.end, "probability": w.probability}
-                for w in segment.words
-            ]
-        
-        transcript_data["segments"].append(seg_dict)
-        full_text_parts.append(segment.text.strip())
+    with open(txt_path, "w", encoding="utf-8") as txt_f, \
+            open(srt_path, "w", encoding="utf-8") as srt_f, \
+            open(md_path, "w", encoding="utf-8") as md_f:
+        # Markdown (good for AnythingLLM)
+        md_f.write(f"# {base_name}\n\n")
+        md_f.write(f"**Duration**: {format_timestamp(info.duration)}\n")
+        md_f.write(f"**Language**: {info.language}\n\n")
+        md_f.write("---\n\n")
+        md_f.write("## Transcript\n\n")
         
-        # Build SRT format
-        srt_parts.append(
-            f"{i + 1}\n"
-            f"{format_timestamp(segment.start)} --> {format_timestamp(segment.end)}\n"
-            f"{segment.text.strip()}\n"
-        )
+        for i, segment in enumerate(segments):
+            text = segment.text.strip()
+            seg_dict = {
+                "id": i,
+                "start": segment.start,
+                "end": segment.end,
+                "text": text,
+            }
+            
+            # Add word-level timestamps if available
+            if word_timestamps and segment.words:
+                seg_dict["words"] = [
+                    {"word": w.word, "start": w.start, "end": w.end, "probability": w.probability}
+                    for w in segment.words
+                ]
+            
+            transcript_data["segments"].append(seg_dict)
+            
+            if i:
+                txt_f.write(" ")
+                srt_f.write("\n")
+            txt_f.write(text)
+            srt_f.write(
+                f"{i + 1}\n"
+                f"{format_timestamp(segment.start)} --> {format_timestamp(segment.end)}\n"
+                f"{text}\n"
+            )
+            md_f.write(f"**[{format_timestamp(segment.start)}]** {text}\n\n")
     
-    transcript_data["full_text"] = " ".join(full_text_parts)
-    transcript_data["srt"] = "\n".join(srt_parts)
     transcript_data["processing_time"] = time.time() - start_time
     
     print(f"Completed in {transcript_data['processing_time']:.1f} seconds")
     print(f"Detected language: {info.language} ({info.language_probability:.1%} confidence)")
+    print(f"Saved text: {txt_path}")
+    print(f"Saved SRT: {srt_path}")
+    print(f"Saved Markdown: {md_path}")
     
     return transcript_data
 
 
 def save_transcript(transcript_data: dict, output_dir: Path, base_name: str):
-    """Save transcript in multiple formats"""
+    """Save transcript JSON (text, SRT and markdown are streamed by transcribe_audio)"""
     output_dir.mkdir(parents=True, exist_ok=True)
     
     # Save JSON (full data)
     json_path = output_dir / f"{base_name}.json"
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(transcript_data, f, indent=2, ensure_ascii=False)
+    if orjson is not None:
+        with open(json_path, "wb") as f:
+            f.write(orjson.dumps(transcript_data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(transcript_data, f, indent=2, ensure_ascii=False)
     print(f"Saved JSON: {json_path}")
+
+
+def load_model(model_size: str, compute_type: str) -> WhisperModel:
+    """Load the Whisper model in this process"""
+    print(f"Loading Whisper model: {model_size}")
+    print("(This may take a moment on first run as the model downloads...)")
+    model = WhisperModel(model_size, device=DEVICE, compute_type=compute_type)
+    print("Model loaded!\n")
+    return model
+
+
+# Per-process model for CPU batch workers (set by _init_batch_worker)
+_worker_model = None
+
+
+def _init_batch_worker(model_size: str, compute_type: str):
+    """Load one small-footprint CPU model per worker process"""
+    global _worker_model
+    _worker_model = WhisperModel(
+        model_size, device="cpu", compute_type=compute_type,
+        cpu_threads=2, num_workers=1
+    )
+
+
+def _transcribe_in_worker(audio_file: Path, output_dir: Path, word_timestamps: bool) -> Path:
+    """Transcribe and save one file using the worker's model"""
+    transcript = transcribe_audio(
+        str(audio_file), _worker_model, output_dir, audio_file.stem,
+        word_timestamps=word_timestamps
+    )
+    save_transcript(transcript, output_dir, audio_file.stem)
+    return audio_file
+
+
+def transcribe_batch_parallel(audio_files: list, args):
+    """Transcribe files concurrently on CPU, one Whisper model per worker
     
-    # Save plain text
-    txt_path = output_dir / f"{base_name}.txt"
-    with open(txt_path, "w", encoding="utf-8") as f:
-        f.write(transcript_data["full_text"])
-    print(f"Saved text: {txt_path}")
-    
-    # Save SRT (subtitles)
-    srt_path = output_dir / f"{base_name}.srt"
-    with open(srt_path, "w", encoding="utf-8") as f:
-        f.write(transcript_data["srt"])
-    print(f"Saved SRT: {srt_path}")
+    A single file leaves most cores idle, so running several 2-thread
+    workers side by side gives near-linear speedup on multicore machines.
+    """
+    max_workers = min(len(audio_files), max(1, (os.cpu_count() or 2) // 2))
+    print(f"Transcribing on CPU with {max_workers} worker processes (model: {args.model})")
     
-    # Save markdown (good for AnythingLLM)
-    md_path = output_dir / f"{base_name}.md"
-    with open(md_path, "w", encoding="utf-8") as f:
-        f.write(f"# {base_name}\n\n")
-        f.write(f"**Duration**: {format_timestamp(transcript_data['duration'])}\n")
-        f.write(f"**Language**: {transcript_data['language']}\n\n")
-        f.write("---\n\n")
-        f.write("## Transcript\n\n")
-        for seg in transcript_data["segments"]:
-            f.write(f"**[{format_timestamp(seg['start'])}]** {seg['text']}\n\n")
-    print(f"Saved Markdown: {md_path}")
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_batch_worker,
+        initargs=(args.model, args.compute_type),
+    ) as executor:
+        futures = {
+            executor.submit(_transcribe_in_worker, audio_file, args.output_dir, args.words): audio_file
+            for audio_file in audio_files
+        }
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Transcribing"):
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Error processing {futures[future]}: {e}")
 
 
 def main():
@@ -185,20 +271,29 @@ def main():
         default=OUTPUT_DIR,
         help=f"Output directory (default: {OUTPUT_DIR})"
     )
+    parser.add_argument(
+        "--compute-type",
+        default=COMPUTE_TYPE,
+        choices=["auto", "int8", "int8_float16", "int8_float32", "float16", "float32"],
+        help=(
+            f"CTranslate2 compute type (default: {COMPUTE_TYPE}). int8 variants "
+            "roughly halve memory and speed up decoding with a typically "
+            "negligible WER increase; use float16 or float32 for maximum accuracy"
+        )
+    )
     parser.add_argument(
         "--batch",
         action="store_true",
         help="Process all audio files in directory"
     )
+    parser.add_argument(
+        "--words",
+        action="store_true",
+        help="Include word-level timestamps in the JSON output"
+    )
     
     args = parser.parse_args()
     
-    # Load model
-    print(f"Loading Whisper model: {args.model}")
-    print("(This may take a moment on first run as the model downloads...)")
-    model = WhisperModel(args.model, device=DEVICE, compute_type=COMPUTE_TYPE)
-    print("Model loaded!\n")
-    
     # Determine input files
     input_path = Path(args.input)
     
@@ -211,19 +306,36 @@ def main():
         ]
         print(f"Found {len(audio_files)} audio files to process")
         
-        for audio_file in tqdm(audio_files, desc="Transcribing"):
-            try:
-                transcript = transcribe_audio(str(audio_file), model)
-                save_transcript(transcript, args.output_dir, audio_file.stem)
-            except Exception as e:
-                print(f"Error processing {audio_file}: {e}")
+        if DEVICE == "cpu" and len(audio_files) > 1:
+            transcribe_batch_parallel(audio_files, args)
+        else:
+            model = load_model(args.model, args.compute_type)
+            
+            # Batch VAD chunks through the model; single files stay unbatched
+            batch_model, batch_size = model, None
+            if BatchedInferencePipeline is not None:
+                batch_model, batch_size = BatchedInferencePipeline(model=model), 16
+            
+            for audio_file in tqdm(audio_files, desc="Transcribing"):
+                try:
+                    transcript = transcribe_audio(
+                        str(audio_file), batch_model, args.output_dir, audio_file.stem,
+                        batch_size=batch_size, word_timestamps=args.words
+                    )
+                    save_transcript(transcript, args.output_dir, audio_file.stem)
+                except Exception as e:
+                    print(f"Error processing {audio_file}: {e}")
     else:
         # Single file mode
         if not input_path.exists():
             print(f"Error: File not found: {input_path}")
             sys.exit(1)
         
-        transcript = transcribe_audio(str(input_path), model)
+        model = load_model(args.model, args.compute_type)
+        transcript = transcribe_audio(
+            str(input_path), model, args.output_dir, input_path.stem,
+            word_timestamps=args.words
+        )
         save_transcript(transcript, args.output_dir, input_path.stem)
     
     print("\nDone!")
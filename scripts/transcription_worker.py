@@ -20,16 +20,22 @@ Check status:
 """
 
 import argparse
+import atexit
+import functools
 import gc
 import json
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
 import psutil
+import queue
 import re
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import signal
 import sys
+import threading
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -37,34 +43,105 @@ from typing import Optional
 
 # Import database
 try:
-    from database import DatabaseManager, Episode, TranscriptionQueue as DBQueue
+    from database import DB_PATH, DatabaseManager, Episode, TranscriptionQueue as DBQueue
+    from sqlalchemy import func, text, update
     DATABASE_AVAILABLE = True
 except ImportError:
     DATABASE_AVAILABLE = False
     print("ERROR: Database module not available. Run: pip install sqlalchemy")
 
+# File system events (FSEvents on macOS, inotify on Linux) let an idle worker
+# sleep until the database files change instead of polling them
+try:
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
 # Load configuration
 try:
     from config import config
     DEFAULT_MODEL = config.transcription.model if config else "medium"
+    # "auto" resolves to int8 weights for the device in use (see resolve_compute_type)
+    DEFAULT_COMPUTE_TYPE = (config.transcription.compute_type if config else None) or "auto"
     DEFAULT_CHECK_INTERVAL = config.worker.check_interval if config else 60
     DEFAULT_EPISODES_DIR = config.paths.episodes if config else Path("episodes")
     DEFAULT_TRANSCRIPTS_DIR = config.paths.transcripts if config else Path("transcripts")
 except (ImportError, AttributeError):
     print("Warning: Could not load config module. Using defaults.")
     DEFAULT_MODEL = "medium"
+    DEFAULT_COMPUTE_TYPE = "auto"
     DEFAULT_CHECK_INTERVAL = 60
     DEFAULT_EPISODES_DIR = Path("episodes")
     DEFAULT_TRANSCRIPTS_DIR = Path("transcripts")
 
 # Import UI manager
-try:
-    from ui_manager import TranscriptionUI, SimpleUI
-    UI_AVAILABLE = True
-except ImportError:
-    UI_AVAILABLE = False
+from ui_manager import TranscriptionUI, SimpleUI, RICH_AVAILABLE as UI_AVAILABLE
+if not UI_AVAILABLE:
     print("Warning: Rich UI not available. Install with: pip install rich")
 
+class BufferedRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler that buffers writes and flushes on a timer
+
+    The stock handler flushes after every record and stats the file twice
+    per record to decide on rollover. This one keeps a block-buffered stream,
+    tracks the file size itself, and flushes every flush_interval seconds,
+    immediately for ERROR and above, and on close.
+    """
+
+    def __init__(self, *args, buffer_size: int = 64 * 1024,
+                 flush_interval: float = 1.0, **kwargs):
+        self.buffer_size = buffer_size
+        self._size = 0
+        super().__init__(*args, **kwargs)
+        self._stopped = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_periodically, args=(flush_interval,),
+            name="log-flusher", daemon=True
+        )
+        self._flusher.start()
+
+    def _open(self):
+        stream = open(self.baseFilename, self.mode, buffering=self.buffer_size,
+                      encoding=self.encoding, errors=self.errors)
+        self._size = stream.seek(0, os.SEEK_END)
+        return stream
+
+    def emit(self, record):
+        try:
+            msg = self.format(record) + self.terminator
+            # Size is counted in characters, close enough for rotation
+            if self.maxBytes > 0 and self._size and self._size + len(msg) >= self.maxBytes:
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(msg)
+            self._size += len(msg)
+            if record.levelno >= logging.ERROR:
+                self._flush_now()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        """No-op per record; see _flush_now()"""
+
+    def _flush_now(self):
+        self.acquire()
+        try:
+            if self.stream and hasattr(self.stream, "flush"):
+                self.stream.flush()
+        finally:
+            self.release()
+
+    def _flush_periodically(self, interval: float):
+        while not self._stopped.wait(interval):
+            self._flush_now()
+
+    def close(self):
+        self._stopped.set()
+        super().close()  # Closing the stream writes out the buffer
+
+
 # Setup logging
 LOG_FILE = Path("transcription_worker.log")
 QUEUE_FILE = Path("transcription_queue.json")
@@ -75,7 +152,7 @@ logger = logging.getLogger("TranscriptionWorker")
 logger.setLevel(logging.DEBUG)  # Changed to DEBUG to support different log levels
 
 # File handler with rotation (max 10MB per file, keep 3 backups)
-file_handler = RotatingFileHandler(
+file_handler = BufferedRotatingFileHandler(
     LOG_FILE,
     maxBytes=10*1024*1024,  # 10MB
     backupCount=3
@@ -95,16 +172,53 @@ if not UI_AVAILABLE:
     console_handler.setFormatter(console_formatter)
     logger.addHandler(console_handler)
 
-logger.addHandler(file_handler)
+# File writes happen on a listener thread; the worker only enqueues records
+log_queue = queue.Queue(-1)
+log_listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)
+logger.addHandler(QueueHandler(log_queue))
+
+# Shared HTTP session so episode downloads from the same CDN reuse connections
+_HTTP_SESSION = requests.Session()
+_HTTP_ADAPTER = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=3, backoff_factor=0.5)
+)
+_HTTP_SESSION.mount("https://", _HTTP_ADAPTER)
+_HTTP_SESSION.mount("http://", _HTTP_ADAPTER)
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # Bytes per read/write while streaming audio
+
+# Filename cleanup tables, built once at import
+_FN_TRANSLATE = str.maketrans({**dict.fromkeys('<>:"/\\|?*'), '\n': ' ', '\r': ' '})
+_FN_WS = re.compile(r'\s+')
+
+
+@functools.lru_cache(maxsize=1024)
+def resolve_compute_type(compute_type: Optional[str]) -> str:
+    """Map "auto" (or unset) to int8 weights for the device faster-whisper will pick
+
+    int8 weights halve memory traffic vs float16/float32 with negligible WER
+    loss: int8_float16 on CUDA, plain int8 on CPU.
+    """
+    if compute_type and compute_type != "auto":
+        return compute_type
+    try:
+        import ctranslate2
+        on_cuda = ctranslate2.get_cuda_device_count() > 0
+    except Exception:
+        on_cuda = False
+    return "int8_float16" if on_cuda else "int8"
 
 
 def sanitize_filename(filename: str) -> str:
     """Remove/replace characters that are problematic in filenames"""
-    # Remove or replace problematic characters
-    filename = re.sub(r'[<>:"/\\|?*]', '', filename)
-    filename = filename.replace('\n', ' ').replace('\r', ' ')
+    # Remove problematic characters and turn line breaks into spaces
+    filename = filename.translate(_FN_TRANSLATE)
     # Collapse multiple spaces
-    filename = re.sub(r'\s+', ' ', filename).strip()
+    filename = _FN_WS.sub(' ', filename).strip()
     # Limit length
     if len(filename) > 200:
         filename = filename[:200]
@@ -143,7 +257,11 @@ def download_audio_file(episode, output_dir: Path) -> Optional[Path]:
         output_path = output_dir / filename
 
         # Skip if already exists
-        if output_path.exists():
+        try:
+            output_path.stat()
+        except FileNotFoundError:
+            pass
+        else:
             logger.info(f"Audio file already exists: {filename}")
             return output_path
 
@@ -151,19 +269,35 @@ def download_audio_file(episode, output_dir: Path) -> Optional[Path]:
         logger.info(f"Downloading audio: {filename}")
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        response = requests.get(audio_url, stream=True, timeout=30)
+        response = _HTTP_SESSION.get(audio_url, stream=True, timeout=30)
         response.raise_for_status()
 
         total_size = int(response.headers.get("content-length", 0))
+        if total_size > 0:
+            logger.debug("Download size: %.1f MB", total_size / 1024 / 1024)
+
+        # Let urllib3 undo any Content-Encoding while we copy the raw stream
+        response.raw.decode_content = True
+
+        fd = os.open(output_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        if hasattr(os, "posix_fadvise"):  # Not available on macOS
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        # One reusable buffer for the whole download instead of a bytes object per chunk
+        buf = memoryview(bytearray(DOWNLOAD_CHUNK_SIZE))
+        readinto = response.raw.readinto
         downloaded = 0
-
-        with open(output_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-                downloaded += len(chunk)
-                if total_size > 0 and downloaded % (1024 * 1024) == 0:  # Log every MB
-                    progress = (downloaded / total_size) * 100
-                    logger.debug(f"Download progress: {progress:.1f}%")
+        with os.fdopen(fd, "wb", buffering=DOWNLOAD_CHUNK_SIZE) as f:
+            while True:
+                n = readinto(buf)
+                if not n:
+                    break
+                f.write(buf[:n])
+                downloaded += n
+            f.flush()
+            if hasattr(os, "posix_fadvise"):
+                # Whisper reads the file much later; don't hold it in page cache now
+                os.fdatasync(fd)
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
 
         logger.info(f"Downloaded: {filename} ({downloaded / 1024 / 1024:.1f} MB)")
         return output_path
@@ -175,14 +309,40 @@ def download_audio_file(episode, output_dir: Path) -> Optional[Path]:
         return None
 
 
+class DatabaseChangeWatcher:
+    """Sets an event whenever the SQLite database files change on disk
+
+    Watches the database directory and matches the db file and its -wal,
+    -shm and -journal siblings. Events include the worker's own commits, so
+    waiters still confirm a real change with PRAGMA data_version.
+    """
+
+    def __init__(self, db_path: Path, changed: threading.Event):
+        self._prefix = db_path.name
+        self._changed = changed
+        self._observer = Observer()
+        self._observer.daemon = True
+        self._observer.schedule(self, str(db_path.resolve().parent), recursive=False)
+        self._observer.start()
+
+    def dispatch(self, event):
+        """Observer callback (duck-types watchdog's FileSystemEventHandler)"""
+        if os.path.basename(event.src_path).startswith(self._prefix):
+            self._changed.set()
+
+    def stop(self):
+        self._observer.stop()
+
+
 class TranscriptionQueue:
     """Manages the queue of files to transcribe - Database-backed version"""
 
-    def __init__(self, queue_file: Path = None):
+    def __init__(self, queue_file: Path = None, status_ttl: float = 10.0):
         """Initialize database-backed queue
 
         Args:
             queue_file: Ignored - kept for compatibility with old interface
+            status_ttl: Seconds to reuse a get_status() result while idle
         """
         if not DATABASE_AVAILABLE:
             raise RuntimeError("Database not available. Install SQLAlchemy.")
@@ -190,135 +350,300 @@ class TranscriptionQueue:
         self.db = None
         self.current_queue_item = None
         self.current_episode = None
+        self._status_ttl = status_ttl
+        self._status_cache = None  # (monotonic timestamp, status dict)
+        self._wake = threading.Event()
+        self._watcher = None
+        if WATCHDOG_AVAILABLE:
+            try:
+                self._watcher = DatabaseChangeWatcher(DB_PATH, self._wake)
+            except Exception as e:
+                logger.debug("Database file watching unavailable, polling instead: %s", e)
         logger.info("Initialized database-backed transcription queue")
 
     def _get_session(self):
-        """Get a fresh database session"""
-        if self.db:
-            self.db.close()
-        self.db = DatabaseManager.get_session()
+        """Get the queue's long-lived database session
+
+        The session is created once and reused so its pooled connection stays
+        open; expire_all() makes the next reads fetch fresh rows instead.
+        """
+        if self.db is None:
+            self.db = DatabaseManager.get_session()
+        else:
+            self.db.expire_all()
         return self.db
 
-    def add_file(self, file_path: str):
-        """Add a file to the pending queue (legacy compatibility - not used with DB)"""
-        # This method is kept for compatibility but not used
-        # Episodes are added to queue via the API
-        logger.debug(f"add_file called (not used in DB mode): {file_path}")
+    def _invalidate_status(self):
+        """Drop the cached status after this worker changes queue state"""
+        self._status_cache = None
 
-    def get_next(self) -> Optional[str]:
-        """Get next file to process from database queue"""
-        try:
-            db = self._get_session()
+    def _data_version(self) -> Optional[int]:
+        """SQLite's change counter; bumps when another connection commits"""
+        db = self._get_session()
+        version = db.execute(text("PRAGMA data_version")).scalar()
+        db.commit()  # End the read transaction
+        return version
 
-            # Get next pending item ordered by priority (high to low), then by date
-            queue_item = db.query(DBQueue).filter(
-                DBQueue.status == 'pending'
-            ).order_by(
-                DBQueue.priority.desc(),
-                DBQueue.added_to_queue_date.asc()
-            ).first()
+    def wait_for_change(self, timeout: float, poll_interval: float = 1.0,
+                        stop_event: Optional[threading.Event] = None) -> bool:
+        """Sleep until another process commits to the database, or timeout
 
-            if not queue_item:
-                return None
+        New queue items come from the API / desktop app through their own
+        connections, so a data_version change means there may be work to do.
+        Checking the counter is a header read, far cheaper than a queue query.
 
-            # Get the episode details
-            episode = db.query(Episode).filter(Episode.id == queue_item.episode_id).first()
+        With watchdog installed the counter is only re-checked when the
+        database files are touched (or every 30s as a safety net), and a
+        change wakes the wait immediately; otherwise it polls every
+        poll_interval.
 
-            if not episode:
-                logger.error(f"Queue item {queue_item.id} references non-existent episode {queue_item.episode_id}")
-                # Remove invalid queue item
-                db.delete(queue_item)
-                db.commit()
-                return None
+        Args:
+            stop_event: If given, setting it ends the wait immediately
+
+        Returns:
+            True if a change was seen before the timeout
+        """
+        stop_event = stop_event or threading.Event()
+        deadline = time.monotonic() + timeout
+        try:
+            initial = self._data_version()
+        except Exception as e:
+            logger.debug("Change detection unavailable, sleeping instead: %s", e)
+            stop_event.wait(timeout)
+            return False
 
-            # Update queue item status to processing
-            queue_item.status = 'processing'
-            queue_item.started_date = datetime.now()
+        self._wake.clear()
+        next_check = time.monotonic() + 30.0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if self._watcher is not None:
+                touched = self._wake.wait(min(poll_interval, remaining))
+                if stop_event.is_set():
+                    return False
+                if not touched and time.monotonic() < next_check:
+                    continue
+                self._wake.clear()
+                next_check = time.monotonic() + 30.0
+            elif stop_event.wait(min(poll_interval, remaining)):
+                return False
+            try:
+                if self._data_version() != initial:
+                    self._invalidate_status()
+                    return True
+            except Exception as e:
+                logger.debug("Change detection failed: %s", e)
+                if self.db is not None:
+                    self.db.rollback()
 
-            # Update episode status
-            episode.transcription_status = 'processing'
+    def wake(self):
+        """End a pending wait_for_change early (e.g. on shutdown)"""
+        self._wake.set()
 
-            db.commit()
+    def add_file(self, file_path: str):
+        """Add a file to the pending queue (legacy compatibility - not used with DB)"""
+        # This method is kept for compatibility but not used
+        # Episodes are added to queue via the API
+        logger.debug("add_file called (not used in DB mode): %s", file_path)
 
-            # Store current item for later updates
-            self.current_queue_item = queue_item.id
-            self.current_episode = episode.id
+    def _claim_next(self, db):
+        """Claim the next pending item in the current transaction (no commit)
 
-            # Get or download audio file path
-            audio_path = episode.audio_file_path
+        Returns:
+            (queue_item, episode) for the claimed item, or None
+        """
+        # Next pending item ordered by priority (high to low), then by date.
+        # SKIP LOCKED lets several workers share the queue on databases that
+        # support it; SQLite ignores it and serializes writers instead.
+        next_id = db.query(DBQueue.id).filter(
+            DBQueue.status == 'pending'
+        ).order_by(
+            DBQueue.priority.desc(),
+            DBQueue.added_to_queue_date.asc()
+        ).limit(1).with_for_update(skip_locked=True).scalar_subquery()
+
+        claim = (
+            update(DBQueue)
+            .where(DBQueue.id == next_id, DBQueue.status == 'pending')
+            .values(status='processing', started_date=datetime.now())
+        )
+        if db.get_bind().dialect.update_returning:
+            # Select and claim it in one atomic statement
+            queue_item = db.execute(
+                claim.returning(DBQueue.id, DBQueue.episode_id, DBQueue.priority)
+            ).first()
+        else:
+            # SQLite < 3.35 has no RETURNING: pick the row, then claim it by id
+            queue_item = db.query(
+                DBQueue.id, DBQueue.episode_id, DBQueue.priority
+            ).filter(DBQueue.id == next_id).first()
+            if queue_item is not None and db.execute(
+                claim.where(DBQueue.id == queue_item.id)
+            ).rowcount == 0:
+                queue_item = None  # Another worker claimed it first
+
+        if queue_item is None:
+            return None
 
-            if not audio_path or not Path(audio_path).exists():
-                # No local file - try to download
-                logger.info(f"Episode {episode.id} not downloaded. Attempting download...")
+        self._invalidate_status()
 
-                downloaded_path = download_audio_file(episode, Path(DEFAULT_EPISODES_DIR))
+        # Get the episode details (just what's needed to find/download the audio)
+        episode = db.query(
+            Episode.id, Episode.title, Episode.episode_number,
+            Episode.audio_url, Episode.audio_file_path
+        ).filter(Episode.id == queue_item.episode_id).first()
 
-                if downloaded_path:
-                    # Update episode with downloaded file path
-                    episode.audio_file_path = str(downloaded_path)
-                    episode.is_downloaded = True
-                    episode.downloaded_date = datetime.now()
-                    episode.file_size = downloaded_path.stat().st_size
-                    db.commit()
+        if not episode:
+            logger.error(f"Queue item {queue_item.id} references non-existent episode {queue_item.episode_id}")
+            # Remove invalid queue item
+            db.query(DBQueue).filter(DBQueue.id == queue_item.id).delete(synchronize_session=False)
+            return None
 
-                    audio_path = str(downloaded_path)
-                    logger.info(f"Successfully downloaded: {downloaded_path.name}")
-                else:
-                    # Download failed
-                    logger.error(f"Failed to download audio for episode {episode.id}")
-                    self.mark_failed(None, "Failed to download audio file")
-                    return None
+        # Update episode status
+        db.query(Episode).filter(Episode.id == episode.id).update(
+            {Episode.transcription_status: 'processing'}, synchronize_session=False
+        )
+        return queue_item, episode
+
+    def _start_claimed(self, db, queue_item, episode) -> Optional[str]:
+        """Track a committed claim and make sure its audio is on disk"""
+        # Store current item for later updates
+        self.current_queue_item = queue_item.id
+        self.current_episode = episode.id
+
+        # Get or download audio file path
+        audio_path = episode.audio_file_path
+
+        if not audio_path or not Path(audio_path).exists():
+            # No local file - try to download
+            logger.info(f"Episode {episode.id} not downloaded. Attempting download...")
+
+            downloaded_path = download_audio_file(episode, Path(DEFAULT_EPISODES_DIR))
+
+            if downloaded_path:
+                # Update episode with downloaded file path
+                db.query(Episode).filter(Episode.id == episode.id).update({
+                    Episode.audio_file_path: str(downloaded_path),
+                    Episode.is_downloaded: True,
+                    Episode.downloaded_date: datetime.now(),
+                    Episode.file_size: downloaded_path.stat().st_size,
+                }, synchronize_session=False)
+                db.commit()
 
-            logger.info(f"Processing queue item {queue_item.id}: {episode.title} (priority: {queue_item.priority})")
-            return audio_path
+                audio_path = str(downloaded_path)
+                logger.info(f"Successfully downloaded: {downloaded_path.name}")
+            else:
+                # Download failed
+                logger.error(f"Failed to download audio for episode {episode.id}")
+                self.mark_failed(None, "Failed to download audio file")
+                return None
+
+        logger.info(f"Processing queue item {queue_item.id}: {episode.title} (priority: {queue_item.priority})")
+        return audio_path
+
+    def get_next(self) -> Optional[str]:
+        """Get next file to process from database queue"""
+        try:
+            db = self._get_session()
+            claimed = self._claim_next(db)
+            db.commit()  # Also ends the read transaction when nothing was claimed
+
+            if claimed is None:
+                return None
+            return self._start_claimed(db, *claimed)
 
         except Exception as e:
             logger.error(f"Error getting next queue item: {e}")
-            if db:
-                db.rollback()
+            if self.db is not None:
+                self.db.rollback()
             return None
 
+    def _apply_completed(self, db, file_path: str) -> bool:
+        """Stage the current item's completion in the current transaction (no commit)
+
+        Returns:
+            False if there is no current item to complete
+        """
+        if not self.current_queue_item or not self.current_episode:
+            logger.warning("No current queue item to mark as completed")
+            return False
+
+        now = datetime.now()
+
+        # Update queue item and episode directly, without loading the rows
+        db.query(DBQueue).filter(DBQueue.id == self.current_queue_item).update({
+            DBQueue.status: 'completed',
+            DBQueue.completed_date: now,
+        }, synchronize_session=False)
+
+        db.query(Episode).filter(Episode.id == self.current_episode).update({
+            Episode.transcription_status: 'completed',
+            Episode.is_transcribed: True,
+            Episode.is_in_queue: False,
+            Episode.transcribed_date: now,
+            # Set transcript path
+            Episode.transcript_path: str(Path(DEFAULT_TRANSCRIPTS_DIR) / f"{Path(file_path).stem}.json"),
+        }, synchronize_session=False)
+
+        self._invalidate_status()
+        return True
+
+    def _finish_completed(self, file_path: str):
+        """Log a committed completion and clear current tracking"""
+        logger.info(f"Marked as completed: {Path(file_path).name}")
+        self.current_queue_item = None
+        self.current_episode = None
+
     def mark_completed(self, file_path: str):
         """Mark file as completed in database"""
         try:
             db = self._get_session()
-
-            if not self.current_queue_item or not self.current_episode:
-                logger.warning("No current queue item to mark as completed")
+            if not self._apply_completed(db, file_path):
                 return
+            db.commit()
+            self._finish_completed(file_path)
 
-            # Update queue item
-            queue_item = db.query(DBQueue).filter(DBQueue.id == self.current_queue_item).first()
-            if queue_item:
-                queue_item.status = 'completed'
-                queue_item.completed_date = datetime.now()
-
-            # Update episode
-            episode = db.query(Episode).filter(Episode.id == self.current_episode).first()
-            if episode:
-                episode.transcription_status = 'completed'
-                episode.is_transcribed = True
-                episode.is_in_queue = False
-                episode.transcribed_date = datetime.now()
+        except Exception as e:
+            logger.error(f"Error marking as completed: {e}")
+            if self.db is not None:
+                self.db.rollback()
 
-                # Set transcript path
-                transcript_name = Path(file_path).stem
-                episode.transcript_path = str(Path(DEFAULT_TRANSCRIPTS_DIR) / f"{transcript_name}.json")
+    def complete_and_get_next(self, file_path: str) -> Optional[str]:
+        """Mark the current file completed and claim the next one in one transaction
 
+        Equivalent to mark_completed() followed by get_next(), but the queue
+        bookkeeping for both is committed together.
+        """
+        try:
+            db = self._get_session()
+            if not self._apply_completed(db, file_path):
+                return self.get_next()
+            claimed = self._claim_next(db)
             db.commit()
-            logger.info(f"Marked as completed: {Path(file_path).name}")
+            self._finish_completed(file_path)
 
-            # Clear current tracking
-            self.current_queue_item = None
-            self.current_episode = None
+        except Exception as e:
+            logger.error(f"Error completing and claiming next queue item: {e}")
+            if self.db is not None:
+                self.db.rollback()
+            # Fall back to separate transactions so the completion isn't lost
+            self.mark_completed(file_path)
+            return self.get_next()
 
+        try:
+            if claimed is None:
+                return None
+            return self._start_claimed(db, *claimed)
         except Exception as e:
-            logger.error(f"Error marking as completed: {e}")
-            if db:
-                db.rollback()
+            logger.error(f"Error getting next queue item: {e}")
+            if self.db is not None:
+                self.db.rollback()
+            return None
 
     def mark_failed(self, file_path: str, error: str, max_retries: int = 3):
         """Mark file as failed or retry in database"""
+        file_name = Path(file_path).name if file_path else 'unknown'
         try:
             db = self._get_session()
 
@@ -326,8 +651,10 @@ class TranscriptionQueue:
                 logger.warning("No current queue item to mark as failed")
                 return
 
-            # Update queue item
-            queue_item = db.query(DBQueue).filter(DBQueue.id == self.current_queue_item).first()
+            # Only the retry count is needed to decide what happens next
+            queue_item = db.query(DBQueue.retry_count).filter(
+                DBQueue.id == self.current_queue_item
+            ).first()
             if not queue_item:
                 return
 
@@ -335,29 +662,40 @@ class TranscriptionQueue:
 
             if retry_count < max_retries:
                 # Retry
-                queue_item.status = 'pending'
-                queue_item.retry_count = retry_count + 1
-                queue_item.error_message = error
-                queue_item.started_date = None
-                logger.warning(f"Failed: {Path(file_path).name if file_path else 'unknown'} - {error}. "
+                queue_update = {
+                    DBQueue.status: 'pending',
+                    DBQueue.retry_count: retry_count + 1,
+                    DBQueue.error_message: error,
+                    DBQueue.started_date: None,
+                }
+                logger.warning(f"Failed: {file_name} - {error}. "
                              f"Retry {retry_count + 1}/{max_retries}")
             else:
                 # Max retries exceeded
-                queue_item.status = 'failed'
-                queue_item.error_message = error
-                queue_item.completed_date = datetime.now()
-                logger.error(f"Failed permanently: {Path(file_path).name if file_path else 'unknown'} - {error} "
+                queue_update = {
+                    DBQueue.status: 'failed',
+                    DBQueue.error_message: error,
+                    DBQueue.completed_date: datetime.now(),
+                }
+                logger.error(f"Failed permanently: {file_name} - {error} "
                            f"(after {retry_count} retries)")
+            db.query(DBQueue).filter(DBQueue.id == self.current_queue_item).update(
+                queue_update, synchronize_session=False
+            )
 
             # Update episode
-            episode = db.query(Episode).filter(Episode.id == self.current_episode).first()
-            if episode:
-                episode.transcription_status = 'failed' if retry_count >= max_retries else 'queued'
-                episode.transcription_error = error
-                if retry_count >= max_retries:
-                    episode.is_in_queue = False
+            episode_update = {
+                Episode.transcription_status: 'failed' if retry_count >= max_retries else 'queued',
+                Episode.transcription_error: error,
+            }
+            if retry_count >= max_retries:
+                episode_update[Episode.is_in_queue] = False
+            db.query(Episode).filter(Episode.id == self.current_episode).update(
+                episode_update, synchronize_session=False
+            )
 
             db.commit()
+            self._invalidate_status()
 
             # Clear current tracking
             self.current_queue_item = None
@@ -365,36 +703,78 @@ class TranscriptionQueue:
 
         except Exception as e:
             logger.error(f"Error marking as failed: {e}")
-            if db:
-                db.rollback()
+            if self.db is not None:
+                self.db.rollback()
 
-    def get_status(self) -> dict:
-        """Get queue status from database"""
+    def release_current(self):
+        """Put a claimed but unfinished item back in the queue (e.g. on shutdown)
+
+        Nothing else resets this worker's 'processing' rows, so without this
+        an item claimed just before shutdown would never be transcribed.
+        """
+        if not self.current_queue_item or not self.current_episode:
+            return
         try:
             db = self._get_session()
+            db.query(DBQueue).filter(
+                DBQueue.id == self.current_queue_item, DBQueue.status == 'processing'
+            ).update({
+                DBQueue.status: 'pending',
+                DBQueue.started_date: None,
+            }, synchronize_session=False)
+            db.query(Episode).filter(
+                Episode.id == self.current_episode, Episode.transcription_status == 'processing'
+            ).update({Episode.transcription_status: 'queued'}, synchronize_session=False)
+            db.commit()
+            self._invalidate_status()
+            logger.info(f"Returned queue item {self.current_queue_item} to pending")
 
-            pending = db.query(DBQueue).filter(DBQueue.status == 'pending').count()
-            processing = db.query(DBQueue).filter(DBQueue.status == 'processing').count()
-            completed = db.query(DBQueue).filter(DBQueue.status == 'completed').count()
-            failed = db.query(DBQueue).filter(DBQueue.status == 'failed').count()
+            # Clear current tracking
+            self.current_queue_item = None
+            self.current_episode = None
 
-            # Get current processing item if any
-            processing_item = db.query(DBQueue).filter(DBQueue.status == 'processing').first()
-            processing_file = None
-            if processing_item:
-                episode = db.query(Episode).filter(Episode.id == processing_item.episode_id).first()
-                if episode:
-                    processing_file = episode.title
+        except Exception as e:
+            logger.error(f"Error releasing queue item: {e}")
+            if self.db is not None:
+                self.db.rollback()
 
-            return {
-                "pending": pending,
+    def get_status(self) -> dict:
+        """Get queue status from database (cached for status_ttl seconds)"""
+        if self._status_cache is not None:
+            cached_at, status = self._status_cache
+            if time.monotonic() - cached_at < self._status_ttl:
+                return status
+
+        try:
+            db = self._get_session()
+
+            # All status counts in one round-trip
+            counts = dict(
+                db.query(DBQueue.status, func.count(DBQueue.id))
+                .group_by(DBQueue.status)
+                .all()
+            )
+
+            # Get current processing item (and its episode title) if any
+            processing_row = db.query(DBQueue.id, Episode.title).outerjoin(
+                Episode, Episode.id == DBQueue.episode_id
+            ).filter(DBQueue.status == 'processing').first()
+            processing_file = processing_row.title if processing_row else None
+            db.commit()  # End the read transaction
+
+            status = {
+                "pending": counts.get('pending', 0),
                 "processing": processing_file,
-                "completed": completed,
-                "failed": failed
+                "completed": counts.get('completed', 0),
+                "failed": counts.get('failed', 0)
             }
+            self._status_cache = (time.monotonic(), status)
+            return status
 
         except Exception as e:
             logger.error(f"Error getting queue status: {e}")
+            if self.db is not None:
+                self.db.rollback()  # Keep the shared session usable
             return {
                 "pending": 0,
                 "processing": None,
@@ -408,25 +788,75 @@ class TranscriptionQueue:
             self.db.close()
 
 
+class StatusFileWriter:
+    """Writes status snapshots to disk on a background thread
+
+    Only the newest snapshots matter to the UI, so when the writer falls
+    behind the oldest pending one is dropped instead of blocking the worker.
+    """
+
+    def __init__(self, path: Path, max_pending: int = 4):
+        self.path = path
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name="status-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, status_data: Optional[dict]):
+        """Queue a snapshot for writing (never blocks)"""
+        while True:
+            try:
+                self._queue.put_nowait(status_data)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()  # Drop the oldest snapshot
+                except queue.Empty:
+                    pass
+
+    def close(self, timeout: float = 5.0):
+        """Flush queued snapshots and stop the writer thread"""
+        self.write(None)
+        self._thread.join(timeout)
+
+    def _run(self):
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        while True:
+            status_data = self._queue.get()
+            if status_data is None:
+                return
+            try:
+                with open(tmp_path, 'w') as f:
+                    json.dump(status_data, f, indent=2)
+                # Readers never see a half-written file
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.error(f"Failed to write status file: {e}")
+
+
 class TranscriptionWorker:
     """Background worker that monitors and transcribes audio files"""
 
     def __init__(self, episodes_dir: Path, transcripts_dir: Path,
                  model: str, check_interval: int, use_rich_ui: bool = True,
-                 idle_timeout: Optional[int] = None, max_retries: int = 3):
+                 idle_timeout: Optional[int] = None, max_retries: int = 3,
+                 compute_type: str = DEFAULT_COMPUTE_TYPE):
         self.episodes_dir = episodes_dir
         self.transcripts_dir = transcripts_dir
         self.model = model
+        self.compute_type = resolve_compute_type(compute_type)
         self.check_interval = check_interval
         self.idle_timeout = idle_timeout  # Minutes before auto-shutdown
         self.max_retries = max_retries
         self.queue = TranscriptionQueue(QUEUE_FILE)
+        self.status_writer = StatusFileWriter(STATUS_FILE)
         self.running = True
+        self._shutdown_event = threading.Event()  # Wakes idle/error sleeps on shutdown
         self.whisper_model = None
         self.last_activity = datetime.now()
         self.model_loaded_at = None
         self.idle_check_count = 0  # Track how many times we've been idle
         self.process = psutil.Process()  # For resource monitoring
+        self._mem_cache = (0.0, None)  # (monotonic timestamp, usage dict)
 
         # Initialize UI
         if use_rich_ui and UI_AVAILABLE:
@@ -442,25 +872,49 @@ class TranscriptionWorker:
         """Handle shutdown signals"""
         logger.info("Shutdown signal received. Finishing current task...")
         self.running = False
+        self._shutdown_event.set()
+        self.queue.wake()
 
-    def _get_memory_usage(self) -> dict:
-        """Get current memory usage in MB"""
-        mem_info = self.process.memory_info()
-        return {
-            "rss_mb": mem_info.rss / 1024 / 1024,  # Resident Set Size
-            "vms_mb": mem_info.vms / 1024 / 1024,  # Virtual Memory Size
-            "percent": self.process.memory_percent()
-        }
+    def _get_memory_usage(self, max_age: float = 1.0) -> dict:
+        """Get current memory usage in MB
+
+        Args:
+            max_age: Reuse a reading taken within this many seconds
+                (pass 0 when measuring a before/after delta)
+        """
+        cached_at, usage = self._mem_cache
+        now = time.monotonic()
+        if usage is not None and now - cached_at < max_age:
+            return usage
+
+        # oneshot() reads /proc once for both memory_info and memory_percent
+        with self.process.oneshot():
+            mem_info = self.process.memory_info()
+            usage = {
+                "rss_mb": mem_info.rss / 1024 / 1024,  # Resident Set Size
+                "vms_mb": mem_info.vms / 1024 / 1024,  # Virtual Memory Size
+                "percent": self.process.memory_percent(memtype="rss")
+            }
+        self._mem_cache = (now, usage)
+        return usage
 
     def _unload_whisper_model(self):
         """Unload the Whisper model to free memory"""
         if self.whisper_model is not None:
-            mem_before = self._get_memory_usage()
+            mem_before = self._get_memory_usage(max_age=0)
             logger.info(f"Unloading Whisper model (current memory: {mem_before['rss_mb']:.1f} MB)...")
             self.whisper_model = None
             self.model_loaded_at = None
-            gc.collect()  # Force garbage collection
-            mem_after = self._get_memory_usage()
+            mem_after = self._get_memory_usage(max_age=0)
+            # Reference counting usually frees the model right away; only pay for a
+            # full collection if it is still held (e.g. by a reference cycle)
+            if mem_before['rss_mb'] - mem_after['rss_mb'] < 100:
+                gc.collect()
+                mem_after = self._get_memory_usage(max_age=0)
+            # Return cached GPU blocks too, if torch is already loaded
+            torch = sys.modules.get("torch")
+            if torch is not None and torch.cuda.is_available():
+                torch.cuda.empty_cache()
             freed = mem_before['rss_mb'] - mem_after['rss_mb']
             logger.info(f"Model unloaded. Freed {freed:.1f} MB "
                        f"(current memory: {mem_after['rss_mb']:.1f} MB)")
@@ -470,13 +924,13 @@ class TranscriptionWorker:
         if self.whisper_model is None:
             try:
                 from faster_whisper import WhisperModel
-                mem_before = self._get_memory_usage()
+                mem_before = self._get_memory_usage(max_age=0)
                 logger.info(f"Loading Whisper model: {self.model} "
                           f"(current memory: {mem_before['rss_mb']:.1f} MB)")
                 logger.info("(This may take a moment on first run as model downloads...)")
-                self.whisper_model = WhisperModel(self.model, device="auto", compute_type="auto")
+                self.whisper_model = WhisperModel(self.model, device="auto", compute_type=self.compute_type)
                 self.model_loaded_at = datetime.now()
-                mem_after = self._get_memory_usage()
+                mem_after = self._get_memory_usage(max_age=0)
                 used = mem_after['rss_mb'] - mem_before['rss_mb']
                 logger.info(f"Model loaded successfully! Used {used:.1f} MB "
                           f"(current memory: {mem_after['rss_mb']:.1f} MB)")
@@ -511,41 +965,56 @@ class TranscriptionWorker:
 
         audio_extensions = {".mp3", ".wav", ".m4a", ".ogg", ".flac", ".webm"}
 
-        for file_path in self.episodes_dir.iterdir():
-            if file_path.suffix.lower() in audio_extensions:
-                # Check if already transcribed
-                transcript_json = self.transcripts_dir / f"{file_path.stem}.json"
-                if not transcript_json.exists():
-                    self.queue.add_file(str(file_path))
+        # scandir's entries carry their file type, so no extra stat per child
+        with os.scandir(self.episodes_dir) as entries:
+            for entry in entries:
+                stem, ext = os.path.splitext(entry.name)
+                if ext.lower() in audio_extensions and entry.is_file():
+                    # Check if already transcribed
+                    transcript_json = self.transcripts_dir / f"{stem}.json"
+                    if not transcript_json.exists():
+                        self.queue.add_file(entry.path)
 
     def _transcribe_file(self, file_path: str) -> bool:
         """Transcribe a single file with error handling"""
+        audio_path = Path(file_path)
+        file_name, file_stem = audio_path.name, audio_path.stem
         try:
             # Import transcription function
             from transcribe import transcribe_audio, save_transcript
 
-            logger.info(f"Starting transcription: {Path(file_path).name}")
+            logger.info(f"Starting transcription: {file_name}")
             self.last_activity = datetime.now()  # Update activity timestamp
 
             # Ensure model is loaded
             self._load_whisper_model()
 
-            # Get memory usage before transcription
-            mem_before = self._get_memory_usage()
-            logger.debug(f"Memory before transcription: {mem_before['rss_mb']:.1f} MB "
-                        f"({mem_before['percent']:.1f}%)")
+            # Get memory usage before transcription (psutil only if it will be logged)
+            debug_enabled = logger.isEnabledFor(logging.DEBUG)
+            if debug_enabled:
+                mem_before = self._get_memory_usage()
+                logger.debug("Memory before transcription: %.1f MB (%.1f%%)",
+                             mem_before['rss_mb'], mem_before['percent'])
 
-            # Transcribe
-            transcript_data = transcribe_audio(file_path, self.whisper_model)
+            # Transcribe (text/SRT/markdown stream straight into transcripts_dir).
+            # Segments are short-lived and freed by refcounting, so skip the
+            # cyclic GC's periodic full-heap scans while Whisper runs.
+            gc.disable()
+            try:
+                transcript_data = transcribe_audio(
+                    file_path, self.whisper_model, self.transcripts_dir, file_stem
+                )
+            finally:
+                gc.enable()
 
             # Get memory usage after transcription
-            mem_after = self._get_memory_usage()
-            logger.debug(f"Memory after transcription: {mem_after['rss_mb']:.1f} MB "
-                        f"({mem_after['percent']:.1f}%)")
+            if debug_enabled:
+                mem_after = self._get_memory_usage()
+                logger.debug("Memory after transcription: %.1f MB (%.1f%%)",
+                             mem_after['rss_mb'], mem_after['percent'])
 
             # Save results
-            self.transcripts_dir.mkdir(parents=True, exist_ok=True)
-            save_transcript(transcript_data, self.transcripts_dir, Path(file_path).stem)
+            save_transcript(transcript_data, self.transcripts_dir, file_stem)
 
             # Run speaker diarization if HF_TOKEN is available
             hf_token = os.environ.get('HF_TOKEN')
@@ -554,9 +1023,9 @@ class TranscriptionWorker:
                     from speaker_diarization import process_episode
                     logger.info("Running speaker diarization...")
 
-                    transcript_path = self.transcripts_dir / f"{Path(file_path).stem}.json"
+                    transcript_path = self.transcripts_dir / f"{file_stem}.json"
                     enhanced_transcript = process_episode(
-                        Path(file_path),
+                        audio_path,
                         transcript_path,
                         hf_token,
                         num_speakers=2  # Default for Ice Cream Social (Matt & Paul)
@@ -578,17 +1047,16 @@ class TranscriptionWorker:
 
         except MemoryError as e:
             error_msg = f"Out of memory during transcription: {e}"
-            logger.error(f"Transcription failed for {Path(file_path).name}: {error_msg}")
+            logger.error(f"Transcription failed for {file_name}: {error_msg}")
             self._update_status(file_path, "failed", {"error": error_msg})
             # Try to free memory
             self._unload_whisper_model()
-            gc.collect()
             return False
 
         except Exception as e:
             error_msg = str(e)
-            logger.error(f"Transcription failed for {Path(file_path).name}: {error_msg}")
-            logger.debug(f"Full error details:", exc_info=True)
+            logger.error(f"Transcription failed for {file_name}: {error_msg}")
+            logger.debug("Full error details:", exc_info=True)
             self._update_status(file_path, "failed", {"error": error_msg})
             return False
 
@@ -596,7 +1064,7 @@ class TranscriptionWorker:
         """Update status file with latest info"""
         status_data = {
             "last_updated": datetime.now().isoformat(),
-            "current_file": Path(file_path).name,
+            "current_file": os.path.basename(file_path),
             "status": status,
             "queue_status": self.queue.get_status()
         }
@@ -607,8 +1075,7 @@ class TranscriptionWorker:
         elif status == "failed":
             status_data["error"] = data.get("error", "Unknown error")
 
-        with open(STATUS_FILE, 'w') as f:
-            json.dump(status_data, f, indent=2)
+        self.status_writer.write(status_data)
 
     def run(self):
         """Main worker loop"""
@@ -618,6 +1085,7 @@ class TranscriptionWorker:
             "Watching": str(self.episodes_dir),
             "Output": str(self.transcripts_dir),
             "Model": self.model,
+            "Compute Type": self.compute_type,
             "Check Interval": f"{self.check_interval}s",
         })
 
@@ -626,7 +1094,7 @@ class TranscriptionWorker:
         logger.info("Transcription Worker Started")
         logger.info(f"Watching: {self.episodes_dir}")
         logger.info(f"Output: {self.transcripts_dir}")
-        logger.info(f"Model: {self.model}")
+        logger.info(f"Model: {self.model} ({self.compute_type})")
         logger.info(f"Check interval: {self.check_interval} seconds")
         logger.info("=" * 60)
 
@@ -640,19 +1108,30 @@ class TranscriptionWorker:
         logger.info(f"Initial queue status: {status['pending']} pending, "
                    f"{status['completed']} completed, {status['failed']} failed")
 
-        # Main loop
+        # Main loop (stop_live runs in show_final_summary)
+        self.ui.start_live()
+        next_file = None
         while self.running:
             try:
-                # Process next file in queue
-                next_file = self.queue.get_next()
+                self.ui.refresh()
+
+                # Process next file in queue (may already be claimed below)
+                if next_file is None:
+                    next_file = self.queue.get_next()
 
                 if next_file:
                     success = self._transcribe_file(next_file)
-                    if success:
+                    if success and self.running:
+                        # Complete this one and claim the next in one transaction
+                        next_file = self.queue.complete_and_get_next(next_file)
+                    elif success:
+                        # Shutting down - don't claim anything new
                         self.queue.mark_completed(next_file)
+                        next_file = None
                     else:
                         self.queue.mark_failed(next_file, "Transcription failed",
                                              max_retries=self.max_retries)
+                        next_file = None
                     # Reset idle counter on activity
                     self.idle_check_count = 0
                 else:
@@ -665,7 +1144,7 @@ class TranscriptionWorker:
                         self.idle_check_count += 1
 
                         # Log at reduced frequency when idle
-                        # Only log every 30 checks (5 minutes if check_interval=10s)
+                        # Only log every 30 idle checks
                         if self.idle_check_count % 30 == 1:
                             mem = self._get_memory_usage()
                             logger.info(f"Idle - no files to process. "
@@ -673,7 +1152,7 @@ class TranscriptionWorker:
                             self.ui.show_waiting()
                         else:
                             # Use DEBUG level for frequent idle checks
-                            logger.debug(f"No files to process. Waiting {self.check_interval}s...")
+                            logger.debug("No files to process. Waiting %ss...", self.check_interval)
 
                         # Check if we should unload model to free memory
                         self._check_model_unload()
@@ -684,25 +1163,37 @@ class TranscriptionWorker:
                             self.running = False
                             break
 
-                        # Sleep longer when idle to reduce CPU usage
-                        # Progressive backoff: use longer intervals after extended idle
-                        if self.idle_check_count > 60:  # More than 10 minutes idle
-                            sleep_time = min(self.check_interval * 3, 300)  # Max 5 minutes
-                        else:
-                            sleep_time = self.check_interval
-
-                        time.sleep(sleep_time)
+                        # Exponential backoff up to 5 minutes between full queue checks;
+                        # a commit from the API/app wakes us early, so latency stays low
+                        backoff = 2 ** min(self.idle_check_count - 1, 8)
+                        sleep_time = min(self.check_interval * backoff, 300)
+                        if self.idle_timeout is not None:
+                            # Don't sleep past the idle-timeout deadline
+                            idle_seconds = (datetime.now() - self.last_activity).total_seconds()
+                            sleep_time = max(1, min(sleep_time,
+                                                    self.idle_timeout * 60 - idle_seconds))
+
+                        if self.queue.wait_for_change(sleep_time, stop_event=self._shutdown_event):
+                            logger.debug("Database changed - checking queue")
+                        if self._shutdown_event.is_set():
+                            break
 
             except KeyboardInterrupt:
                 logger.info("Keyboard interrupt received")
                 break
             except Exception as e:
+                next_file = None
                 logger.error(f"Error in main loop: {e}")
                 logger.debug("Full error details:", exc_info=True)
-                time.sleep(5)
+                if self._shutdown_event.wait(5):
+                    break
+
+        # An item claimed right before shutdown goes back to the queue
+        self.queue.release_current()
 
         # Show final summary
         self.ui.show_final_summary()
+        self.status_writer.close()
 
         logger.info("=" * 60)
         logger.info("Transcription Worker Stopped")
@@ -739,6 +1230,16 @@ def main():
         choices=["tiny", "base", "small", "medium", "large-v2", "large-v3"],
         help=f"Whisper model size (default: {DEFAULT_MODEL})"
     )
+    parser.add_argument(
+        "--compute-type",
+        default=DEFAULT_COMPUTE_TYPE,
+        choices=["auto", "int8", "int8_float16", "int8_float32", "float16", "float32"],
+        help=(
+            f"CTranslate2 compute type (default: {DEFAULT_COMPUTE_TYPE}). auto picks "
+            "int8_float16 on CUDA and int8 on CPU, which roughly halves memory and "
+            "speeds up decoding; use float16 or float32 for maximum accuracy"
+        )
+    )
     parser.add_argument(
         "--check-interval",
         type=int,
@@ -773,7 +1274,8 @@ def main():
         check_interval=args.check_interval,
         use_rich_ui=not args.no_ui,
         idle_timeout=args.idle_timeout,
-        max_retries=args.max_retries
+        max_retries=args.max_retries,
+        compute_type=args.compute_type
     )
 
     worker.run()
@@ -4,38 +4,109 @@ UI Manager for Ice Cream Social Transcription Worker
 Provides Rich terminal UI with progress tracking and desktop notifications
 """
 
-import os
-import subprocess
+import importlib.util
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
 try:
-    import psutil
-    PSUTIL_AVAILABLE = True
+    from Foundation import NSUserNotification, NSUserNotificationCenter
+    PYOBJC_AVAILABLE = True
 except ImportError:
-    PSUTIL_AVAILABLE = False
-
-from rich.console import Console
-from rich.layout import Layout
-from rich.live import Live
-from rich.panel import Panel
-from rich.progress import (
-    Progress,
-    SpinnerColumn,
-    BarColumn,
-    TextColumn,
-    TimeRemainingColumn,
-    TaskProgressColumn,
-)
-from rich.table import Table
-from rich.text import Text
+    PYOBJC_AVAILABLE = False
+
+# Rich is imported on first TranscriptionUI construction, so headless
+# (SimpleUI) workers never pay for its import chain
+RICH_AVAILABLE = importlib.util.find_spec("rich") is not None
+Console = Group = Layout = Live = Panel = Table = Text = None
+Progress = SpinnerColumn = BarColumn = TextColumn = None
+TimeRemainingColumn = TaskProgressColumn = None
+
+
+def _lazy_import_rich():
+    """Import the rich symbols used by TranscriptionUI into module globals"""
+    global Console, Group, Layout, Live, Panel, Table, Text
+    global Progress, SpinnerColumn, BarColumn, TextColumn
+    global TimeRemainingColumn, TaskProgressColumn
+    if Console is not None:
+        return
+
+    from rich.console import Console, Group
+    from rich.layout import Layout
+    from rich.live import Live
+    from rich.panel import Panel
+    from rich.progress import (
+        Progress,
+        SpinnerColumn,
+        BarColumn,
+        TextColumn,
+        TimeRemainingColumn,
+        TaskProgressColumn,
+    )
+    from rich.table import Table
+    from rich.text import Text
+
+
+_BANNER = """
+╔══════════════════════════════════════════════════════════════╗
+║                                                              ║
+║   🍦  ICE CREAM SOCIAL TRANSCRIPTION WORKER  🍦             ║
+║                                                              ║
+║   Automatically transcribing podcast episodes                ║
+║   Using Faster-Whisper AI                                   ║
+║                                                              ║
+╚══════════════════════════════════════════════════════════════╝
+"""
+_SEP = "=" * 60
+
+@dataclass(slots=True)
+class WorkerStats:
+    """Counters shown in the status panel and final summary"""
+    total_processed: int = 0
+    total_pending: int = 0
+    total_failed: int = 0
+    start_time: datetime = field(default_factory=datetime.now)
+
+
+# Notifications are fire-and-forget so osascript never blocks the worker
+_IS_MAC = sys.platform == 'darwin'
+_NOTIFY_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="notify")
+
+_NOTIFY_SCRIPT_TEMPLATE = 'display notification {msg} with title {title} sound name "Glass"'
+
+
+def _applescript_string(value: str) -> str:
+    """Quote a value as an AppleScript string literal"""
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def _deliver_native_notification(title: str, msg: str) -> bool:
+    """Post a notification through NSUserNotificationCenter
+
+    Returns False when no notification center is available (e.g. when not
+    running from an app bundle) so the caller can fall back to osascript.
+    """
+    center = NSUserNotificationCenter.defaultUserNotificationCenter()
+    if center is None:
+        return False
+    note = NSUserNotification.alloc().init()
+    note.setTitle_(title)
+    note.setInformativeText_(msg)
+    note.setSoundName_("Glass")
+    center.deliverNotification_(note)
+    return True
 
 
 class TranscriptionUI:
     """Rich terminal UI for transcription worker"""
 
     def __init__(self):
+        _lazy_import_rich()
         self.console = Console()
         self.progress = Progress(
             SpinnerColumn(),
@@ -43,40 +114,43 @@ class TranscriptionUI:
             BarColumn(),
             TaskProgressColumn(),
             TimeRemainingColumn(),
+            refresh_per_second=2,
+            auto_refresh=False,  # Redrawn explicitly via refresh()
         )
         self.current_task = None
-        self.stats = {
-            "total_processed": 0,
-            "total_pending": 0,
-            "total_failed": 0,
-            "start_time": datetime.now(),
-        }
+        self._pending_advance = 0.0  # Advances not yet pushed to the progress bar
+        self._last_flush = time.monotonic()
+        self.stats = WorkerStats()
+        self._start_monotonic = time.monotonic()  # Runtime math without datetime
+        self._stats_version = 0  # Bumped whenever stats change
+        self._cached_panel = None
+        self._cached_panel_key = None
+        self._config_render = None  # (config rows, rendered text)
+        self._messages = deque(maxlen=20)  # Recent events shown inside the live view
+        self.live = None
 
     def show_banner(self):
         """Display startup banner"""
-        banner = """
-╔══════════════════════════════════════════════════════════════╗
-║                                                              ║
-║   🍦  ICE CREAM SOCIAL TRANSCRIPTION WORKER  🍦             ║
-║                                                              ║
-║   Automatically transcribing podcast episodes                ║
-║   Using Faster-Whisper AI                                   ║
-║                                                              ║
-╚══════════════════════════════════════════════════════════════╝
-"""
-        self.console.print(banner, style="bold cyan")
+        self.console.print(_BANNER, style="bold cyan")
 
     def show_config(self, config_info: dict):
-        """Display configuration"""
-        table = Table(title="Worker Configuration", show_header=False)
-        table.add_column("Setting", style="cyan")
-        table.add_column("Value", style="green")
+        """Display configuration (rendered once per distinct config)"""
+        rows = tuple((key, str(value)) for key, value in config_info.items())
+        if self._config_render is None or self._config_render[0] != rows:
+            table = Table(title="Worker Configuration", show_header=False)
+            table.add_column("Setting", style="cyan")
+            table.add_column("Value", style="green")
 
-        for key, value in config_info.items():
-            table.add_row(key, str(value))
+            for key, value in rows:
+                table.add_row(key, value)
 
-        self.console.print(table)
-        self.console.print()
+            with self.console.capture() as capture:
+                self.console.print(table)
+                self.console.print()
+            self._config_render = (rows, capture.get())
+
+        self.console.file.write(self._config_render[1])
+        self.console.file.flush()
 
     def show_resource_usage(self, memory_mb: float, memory_percent: float):
         """Display current resource usage"""
@@ -90,23 +164,30 @@ class TranscriptionUI:
         msg = f"💾 Memory: {memory_mb:.1f} MB ({memory_percent:.1f}%)"
         self.console.print(msg, style=style)
 
-    def create_status_panel(self) -> Panel:
-        """Create status panel"""
-        runtime = datetime.now() - self.stats["start_time"]
-        hours, remainder = divmod(int(runtime.total_seconds()), 3600)
+    def create_status_panel(self) -> "Panel":
+        """Create status panel (cached until stats change or the runtime ticks)"""
+        total_seconds = int(time.monotonic() - self._start_monotonic)
+        key = (self._stats_version, total_seconds)
+        if key == self._cached_panel_key:
+            return self._cached_panel
+
+        hours, remainder = divmod(total_seconds, 3600)
         minutes, seconds = divmod(remainder, 60)
 
         status_text = Text()
         status_text.append("⏱️  Runtime: ", style="bold")
         status_text.append(f"{hours:02d}:{minutes:02d}:{seconds:02d}\n", style="cyan")
         status_text.append("✅ Completed: ", style="bold")
-        status_text.append(f"{self.stats['total_processed']}\n", style="green")
+        status_text.append(f"{self.stats.total_processed}\n", style="green")
         status_text.append("⏳ Pending: ", style="bold")
-        status_text.append(f"{self.stats['total_pending']}\n", style="yellow")
+        status_text.append(f"{self.stats.total_pending}\n", style="yellow")
         status_text.append("❌ Failed: ", style="bold")
-        status_text.append(f"{self.stats['total_failed']}", style="red")
+        status_text.append(f"{self.stats.total_failed}", style="red")
 
-        return Panel(status_text, title="[bold]Worker Status[/bold]", border_style="blue")
+        self._cached_panel = Panel(status_text, title="[bold]Worker Status[/bold]",
+                                   border_style="blue")
+        self._cached_panel_key = key
+        return self._cached_panel
 
     def start_transcription(self, filename: str, duration: Optional[float] = None) -> int:
         """Start tracking a transcription"""
@@ -118,49 +199,103 @@ class TranscriptionUI:
             total = 100
 
         self.current_task = self.progress.add_task(desc, total=total)
+        self._pending_advance = 0.0
         return self.current_task
 
     def update_progress(self, task_id: int, advance: float = 1):
-        """Update progress for a task"""
-        if task_id is not None:
-            self.progress.update(task_id, advance=advance)
+        """Update progress for a task
+
+        Advances are accumulated and pushed at most every 50ms, so per-segment
+        callbacks don't each trigger a progress update.
+        """
+        if task_id is None:
+            return
+        self._pending_advance += advance
+        now = time.monotonic()
+        if now - self._last_flush >= 0.05:
+            self._flush_progress(task_id, now)
+
+    def _flush_progress(self, task_id: int, now: Optional[float] = None):
+        """Push accumulated advances to the progress bar"""
+        if self._pending_advance:
+            self.progress.update(task_id, advance=self._pending_advance)
+            self._pending_advance = 0.0
+        self._last_flush = time.monotonic() if now is None else now
+
+    def refresh(self):
+        """Redraw the progress display (auto refresh is off)"""
+        if self.live is not None:
+            self.live.refresh()
+        else:
+            self.progress.refresh()
+
+    def start_live(self):
+        """Hand the terminal to a single Live view (status, progress, events)
+
+        Events are queued and drawn with the next frame instead of each
+        console.print writing to the terminal on its own.
+        """
+        if self.live is None:
+            self.live = Live(get_renderable=self._render_live, console=self.console,
+                             refresh_per_second=4, transient=True)
+            self.live.start()
+
+    def stop_live(self):
+        """Stop the Live view and give the terminal back"""
+        if self.live is not None:
+            self.live.stop()
+            self.live = None
+
+    def _render_live(self):
+        return Group(self.create_status_panel(), self.progress, *self._messages)
+
+    def _emit(self, message: str, style: str):
+        """Print a message, or queue it for the Live view when one is running"""
+        if self.live is not None:
+            self._messages.append(Text(message, style=style))
+        else:
+            self.console.print(message, style=style)
 
     def complete_transcription(self, filename: str, success: bool = True,
                               processing_time: Optional[float] = None):
         """Mark transcription as complete"""
+        self._stats_version += 1
         if success:
-            self.stats["total_processed"] += 1
+            self.stats.total_processed += 1
             msg = f"✅ Completed: {filename}"
             if processing_time:
                 msg += f" ({processing_time:.1f}s)"
-            self.console.print(msg, style="bold green")
+            self._emit(msg, "bold green")
 
             # Send desktop notification
             self.notify_completion(filename, processing_time)
         else:
-            self.stats["total_failed"] += 1
-            self.console.print(f"❌ Failed: {filename}", style="bold red")
+            self.stats.total_failed += 1
+            self._emit(f"❌ Failed: {filename}", "bold red")
 
         if self.current_task is not None:
+            self._flush_progress(self.current_task)
             self.progress.update(self.current_task, completed=True)
             self.current_task = None
+        self.refresh()
 
     def update_queue_stats(self, pending: int):
         """Update queue statistics"""
-        self.stats["total_pending"] = pending
+        if pending != self.stats.total_pending:
+            self.stats.total_pending = pending
+            self._stats_version += 1
 
     def show_waiting(self):
         """Show waiting status"""
-        self.console.print("💤 No files to process. Waiting for new episodes...",
-                          style="dim cyan")
+        self._emit("💤 No files to process. Waiting for new episodes...", "dim cyan")
 
     def show_error(self, message: str):
         """Display error message"""
-        self.console.print(f"❌ Error: {message}", style="bold red")
+        self._emit(f"❌ Error: {message}", "bold red")
 
     def show_info(self, message: str):
         """Display info message"""
-        self.console.print(f"ℹ️  {message}", style="cyan")
+        self._emit(f"ℹ️  {message}", "cyan")
 
     def notify_completion(self, filename: str, processing_time: Optional[float] = None):
         """Send desktop notification on macOS"""
@@ -173,24 +308,24 @@ class TranscriptionUI:
                 msg += f"\nTime: {minutes}m {seconds}s"
 
             # macOS notification
-            if os.name == 'posix' and os.uname().sysname == 'Darwin':
-                script = f'''
-                display notification "{msg}" with title "{title}" sound name "Glass"
-                '''
-                subprocess.run(['osascript', '-e', script],
-                             capture_output=True, timeout=5)
+            if _IS_MAC:
+                # Post in-process when pyobjc is available (no osascript spawn)
+                if PYOBJC_AVAILABLE and _deliver_native_notification(title, msg):
+                    return
+                script = _NOTIFY_SCRIPT_TEMPLATE.format(
+                    msg=_applescript_string(msg), title=_applescript_string(title))
+                import subprocess
+                _NOTIFY_POOL.submit(subprocess.run, ['osascript', '-e', script],
+                                    capture_output=True, timeout=5)
         except Exception:
             # Silently fail if notifications don't work
             pass
 
     def show_final_summary(self):
-        """Display final summary on shutdown"""
-        self.console.print("\n" + "=" * 60, style="cyan")
-        self.console.print("🍦 TRANSCRIPTION WORKER STOPPED", style="bold cyan")
-        self.console.print("=" * 60, style="cyan")
+        """Display final summary on shutdown (rendered, then written once)"""
+        self.stop_live()
 
-        runtime = datetime.now() - self.stats["start_time"]
-        hours, remainder = divmod(int(runtime.total_seconds()), 3600)
+        hours, remainder = divmod(int(time.monotonic() - self._start_monotonic), 3600)
         minutes, seconds = divmod(remainder, 60)
 
         summary = Table(show_header=False)
@@ -198,12 +333,18 @@ class TranscriptionUI:
         summary.add_column("Value", style="green")
 
         summary.add_row("Total Runtime", f"{hours:02d}:{minutes:02d}:{seconds:02d}")
-        summary.add_row("Completed", str(self.stats["total_processed"]))
-        summary.add_row("Pending", str(self.stats["total_pending"]))
-        summary.add_row("Failed", str(self.stats["total_failed"]))
+        summary.add_row("Completed", str(self.stats.total_processed))
+        summary.add_row("Pending", str(self.stats.total_pending))
+        summary.add_row("Failed", str(self.stats.total_failed))
 
-        self.console.print(summary)
-        self.console.print("=" * 60 + "\n", style="cyan")
+        with self.console.capture() as capture:
+            self.console.print("\n" + _SEP, style="cyan")
+            self.console.print("🍦 TRANSCRIPTION WORKER STOPPED", style="bold cyan")
+            self.console.print(_SEP, style="cyan")
+            self.console.print(summary)
+            self.console.print(_SEP + "\n", style="cyan")
+        self.console.file.write(capture.get())
+        self.console.file.flush()
 
 
 # Minimal UI for non-interactive mode
@@ -212,16 +353,12 @@ class SimpleUI:
 
     def __init__(self, logger):
         self.logger = logger
-        self.stats = {
-            "total_processed": 0,
-            "total_pending": 0,
-            "total_failed": 0,
-        }
+        self.stats = WorkerStats()
 
     def show_banner(self):
-        self.logger.info("=" * 60)
+        self.logger.info(_SEP)
         self.logger.info("ICE CREAM SOCIAL TRANSCRIPTION WORKER")
-        self.logger.info("=" * 60)
+        self.logger.info(_SEP)
 
     def show_config(self, config_info: dict):
         for key, value in config_info.items():
@@ -237,20 +374,26 @@ class SimpleUI:
     def update_progress(self, task_id: int, advance: float = 1):
         pass
 
+    def refresh(self):
+        pass
+
+    def start_live(self):
+        pass
+
     def complete_transcription(self, filename: str, success: bool = True,
                               processing_time: Optional[float] = None):
         if success:
-            self.stats["total_processed"] += 1
+            self.stats.total_processed += 1
             msg = f"Completed: {filename}"
             if processing_time:
                 msg += f" ({processing_time:.1f}s)"
             self.logger.info(msg)
         else:
-            self.stats["total_failed"] += 1
+            self.stats.total_failed += 1
             self.logger.error(f"Failed: {filename}")
 
     def update_queue_stats(self, pending: int):
-        self.stats["total_pending"] = pending
+        self.stats.total_pending = pending
 
     def show_waiting(self):
         self.logger.info("No files to process. Waiting...")
@@ -262,18 +405,16 @@ class SimpleUI:
         self.logger.info(message)
 
     def show_final_summary(self):
-        self.logger.info("=" * 60)
+        self.logger.info(_SEP)
         self.logger.info("Worker stopped")
-        self.logger.info(f"Completed: {self.stats['total_processed']}")
-        self.logger.info(f"Pending: {self.stats['total_pending']}")
-        self.logger.info(f"Failed: {self.stats['total_failed']}")
-        self.logger.info("=" * 60)
+        self.logger.info(f"Completed: {self.stats.total_processed}")
+        self.logger.info(f"Pending: {self.stats.total_pending}")
+        self.logger.info(f"Failed: {self.stats.total_failed}")
+        self.logger.info(_SEP)
 
 
 # Test/demo
 if __name__ == "__main__":
-    import time
-
     ui = TranscriptionUI()
     ui.show_banner()
     ui.show_config({
@@ -283,11 +424,14 @@ if __name__ == "__main__":
     })
 
     # Simulate transcription
+    ui.start_live()
     task = ui.start_transcription("Episode 1270.mp3", duration=4595)
 
     for i in range(100):
         time.sleep(0.05)
         ui.update_progress(task, advance=1)
+        if i % 10 == 0:
+            ui.refresh()
 
     ui.complete_transcription("Episode 1270.mp3", success=True, processing_time=2345.7)
     ui.show_final_summary()
@@ -6,31 +6,42 @@ Creates voice embeddings for known speakers and matches against diarization resu
 
 import argparse
 import contextlib
+import functools
+import hashlib
+import importlib.util
 import io
 import json
-import math
 import os
+import re
 import sqlite3
+import threading
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import numpy as np
 
-warnings.filterwarnings("ignore")
-
 # Voice library storage
 LIBRARY_DIR = Path(__file__).parent / "voice_library"
 LEGACY_EMBEDDINGS_FILE = LIBRARY_DIR / "embeddings.json"
 EMBEDDINGS_PYANNOTE_FILE = LIBRARY_DIR / "embeddings_pyannote.json"
 EMBEDDINGS_ECAPA_FILE = LIBRARY_DIR / "embeddings_ecapa.json"
+# Binary file store: float16 matrix in .npy (memory-mapped on load), per-speaker metadata in JSON
+EMBEDDINGS_PYANNOTE_NPY = LIBRARY_DIR / "embeddings_pyannote.npy"
+EMBEDDINGS_PYANNOTE_METADATA = LIBRARY_DIR / "embeddings_pyannote.meta.json"
+EMBEDDINGS_ECAPA_NPY = LIBRARY_DIR / "embeddings_ecapa.npy"
+EMBEDDINGS_ECAPA_METADATA = LIBRARY_DIR / "embeddings_ecapa.meta.json"
+# Per-speaker .npz shards written on add; folded into the matrix above by `compact` or any full save
+EMBEDDING_SHARDS_DIR = LIBRARY_DIR / "shards"
 SAMPLES_DIR = LIBRARY_DIR / "samples"
 SOUND_BITES_DIR = LIBRARY_DIR / "sound_bites"
 DEFAULT_DB_PATH = Path(__file__).parent.parent / "data" / "ice_cream_social.db"
 STORE_AUTO = "auto"
 STORE_JSON = "json"
 STORE_SQLITE = "sqlite"
+EMBED_BATCH_SIZE = 16  # diarization segments per embedding forward
 
 BACKEND_PYANNOTE = "pyannote"
 BACKEND_ECAPA = "ecapa-tdnn"
@@ -56,12 +67,45 @@ LIBRARY_DIR.mkdir(exist_ok=True)
 SAMPLES_DIR.mkdir(exist_ok=True)
 SOUND_BITES_DIR.mkdir(exist_ok=True)
 
-try:
-    from pyannote.audio import Model, Inference
-    import torch
-    import torchaudio
 
-    PYANNOTE_AVAILABLE = True
+def _module_available(name: str) -> bool:
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ModuleNotFoundError:  # parent package missing
+        return False
+
+
+# torch, torchaudio and the embedding backends are imported on first model use
+# (_lazy_import_models), so list/info/remove and other non-inference commands
+# skip seconds of import time
+_TORCH_AVAILABLE = _module_available("torch") and _module_available("torchaudio")
+PYANNOTE_AVAILABLE = _TORCH_AVAILABLE and _module_available("pyannote.audio")
+ECAPA_AVAILABLE = _TORCH_AVAILABLE and _module_available("speechbrain")
+torch = torchaudio = Model = Inference = SpeakerRecognition = None
+
+if not PYANNOTE_AVAILABLE:
+    import sys
+
+    print("pyannote.audio not available for embeddings", file=sys.stderr)
+
+
+def _lazy_import_models():
+    """Import torch, torchaudio and the available embedding backends into module globals"""
+    global torch, torchaudio, Model, Inference, SpeakerRecognition
+    if torch is not None:
+        return
+
+    # pyannote/torchaudio emit deprecation noise at import time; keep the
+    # suppression scoped so runtime warnings (resampling, MKLDNN) stay visible
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        import torch
+        import torchaudio
+
+        if PYANNOTE_AVAILABLE:
+            from pyannote.audio import Model, Inference
+        if ECAPA_AVAILABLE:
+            from speechbrain.inference.speaker import SpeakerRecognition
 
     _orig_torch_load = torch.load
 
@@ -71,18 +115,56 @@ try:
         return _orig_torch_load(*args, **kwargs)
 
     torch.load = _patched_torch_load
+
+
+try:
+    import soxr
+
+    SOXR_AVAILABLE = True
 except ImportError:
-    PYANNOTE_AVAILABLE = False
-    import sys
+    SOXR_AVAILABLE = False
 
-    print("pyannote.audio not available for embeddings", file=sys.stderr)
+try:
+    import soundfile as sf
+
+    SOUNDFILE_AVAILABLE = True
+except ImportError:
+    SOUNDFILE_AVAILABLE = False
+
+try:
+    import miniaudio
+
+    MINIAUDIO_AVAILABLE = True
+except ImportError:
+    MINIAUDIO_AVAILABLE = False
 
 try:
-    from speechbrain.inference.speaker import SpeakerRecognition
+    from numba import njit
 
-    ECAPA_AVAILABLE = True
+    NUMBA_AVAILABLE = True
 except ImportError:
-    ECAPA_AVAILABLE = False
+    NUMBA_AVAILABLE = False
+
+# Below this many speakers a compiled loop beats NumPy's per-call matvec dispatch
+SMALL_LIBRARY_SIZE = 16
+
+if NUMBA_AVAILABLE:
+
+    @njit(fastmath=True, cache=True, boundscheck=False)
+    def _weighted_cos_argmax(matrix, query, weights):
+        """Best row of `matrix @ query * weights` for row-normalized `matrix` and unit `query`."""
+        best = -np.inf
+        best_idx = -1
+        n, d = matrix.shape
+        for i in range(n):
+            s = 0.0
+            for j in range(d):
+                s += matrix[i, j] * query[j]
+            s *= weights[i]
+            if s > best:
+                best = s
+                best_idx = i
+        return best_idx, best
 
 
 def _normalize_sample_date(sample_date: Optional[str]) -> Optional[str]:
@@ -120,32 +202,131 @@ def _resolve_sample_type(
     return "speaker"
 
 
+def _downmix(waveform):
+    """Mono (1, T) view of a (C, T) waveform; stereo averages in a single fused pass."""
+    channels = waveform.shape[0]
+    if channels == 1:
+        return waveform
+    if channels == 2:
+        return waveform.sum(dim=0, keepdim=True).mul_(0.5)
+    return waveform.mean(dim=0, keepdim=True)
+
+
 def _pack_embedding_blob(embedding: np.ndarray) -> Tuple[bytes, int]:
     arr = np.asarray(embedding, dtype=np.float32).flatten()
     return arr.tobytes(), int(arr.shape[0])
 
 
+def _unit(vec: np.ndarray) -> np.ndarray:
+    """L2-normalized float32 copy of `vec`."""
+    arr = np.asarray(vec, dtype=np.float32).ravel()
+    return arr / max(float(np.linalg.norm(arr)), 1e-12)
+
+
 def _unpack_embedding_blob(blob: bytes, dim: int) -> np.ndarray:
+    return _view_embedding_blob(blob, dim).copy()
+
+
+def _view_embedding_blob(blob: bytes, dim: int) -> np.ndarray:
+    """Read-only float32 view over `blob` (no copy), truncated to `dim` when set."""
     arr = np.frombuffer(blob, dtype=np.float32)
     if dim and arr.shape[0] > dim:
         arr = arr[:dim]
-    return arr.copy()
+    return arr
 
 
 class SqliteVoiceEmbeddingStore:
+    _SQL_UPSERT_SAMPLE = """
+    INSERT INTO voice_embedding_samples
+        (sample_key, speaker_name, sample_type, voice_sample_id, episode_id, segment_idx,
+         file_path, sample_date, start_time, end_time, source, backend_model_id,
+         embedding_blob, embedding_norm, normalized, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, datetime('now', 'localtime'))
+    ON CONFLICT(sample_key) DO UPDATE SET
+        voice_sample_id = excluded.voice_sample_id,
+        episode_id = excluded.episode_id,
+        segment_idx = excluded.segment_idx,
+        file_path = excluded.file_path,
+        sample_date = excluded.sample_date,
+        start_time = excluded.start_time,
+        end_time = excluded.end_time,
+        source = excluded.source,
+        backend_model_id = excluded.backend_model_id,
+        embedding_blob = excluded.embedding_blob,
+        embedding_norm = excluded.embedding_norm,
+        normalized = excluded.normalized,
+        updated_at = datetime('now', 'localtime')
+    """
+
+    _SQL_INSERT_CENTROID = """
+    INSERT INTO voice_embedding_centroids
+        (speaker_name, sample_type, short_name, sample_file, sample_count,
+         sample_dates_json, centroid_blob, embedding_dim, dtype, backend_model_id, normalized, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'float32', ?, 1, datetime('now', 'localtime'))
+    ON CONFLICT(speaker_name, sample_type, backend_model_id) DO UPDATE SET
+        short_name = excluded.short_name,
+        sample_file = excluded.sample_file,
+        sample_count = excluded.sample_count,
+        sample_dates_json = excluded.sample_dates_json,
+        centroid_blob = excluded.centroid_blob,
+        embedding_dim = excluded.embedding_dim,
+        dtype = excluded.dtype,
+        normalized = excluded.normalized,
+        updated_at = datetime('now', 'localtime')
+    """
+
     def __init__(self, db_path: Path, quiet: bool = False):
         self.db_path = Path(db_path)
         self.quiet = quiet
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
         self._ensure_schema()
 
-    def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row
-        return conn
+    def _get_conn(self) -> sqlite3.Connection:
+        """Open the shared connection on first use. Autocommit mode; _txn() owns the transactions."""
+        if self._conn is None:
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            self._pragma_tune(conn)
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _pragma_tune(conn: sqlite3.Connection):
+        # Same journal settings as the app's own connection (src-tauri database/mod.rs)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")  # 64 MiB
+        conn.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+
+    @contextlib.contextmanager
+    def _txn(self, immediate: bool = True) -> Iterator[sqlite3.Connection]:
+        """Shared connection inside one explicit transaction; commits on success, rolls back on error.
+
+        Writers take the lock up front (BEGIN IMMEDIATE) so they fail fast instead of mid-transaction;
+        pure readers pass immediate=False.
+        """
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
 
     def _ensure_schema(self):
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        with self._connect() as conn:
+        with self._lock:
+            conn = self._get_conn()
             conn.executescript(
                 """
                 CREATE TABLE IF NOT EXISTS voice_embedding_models (
@@ -206,6 +387,12 @@ class SqliteVoiceEmbeddingStore:
                     ON voice_embedding_centroids(backend_model_id);
                 """
             )
+            # Vectors are stored L2-normalized; rows from before this flag hold raw vectors
+            for table in ("voice_embedding_samples", "voice_embedding_centroids"):
+                try:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN normalized INTEGER NOT NULL DEFAULT 0")
+                except sqlite3.OperationalError:
+                    pass  # column already exists
 
     def _model_row_id(self, conn: sqlite3.Connection, backend: str, embedding_dim: int) -> int:
         meta = MODEL_META.get(backend, {})
@@ -232,12 +419,12 @@ class SqliteVoiceEmbeddingStore:
             raise RuntimeError(f"Failed to resolve voice embedding model row for backend={backend}")
         return int(row["id"])
 
-    def load_centroids(self, backend: str) -> Dict[str, Dict[str, Any]]:
-        with self._connect() as conn:
-            rows = conn.execute(
+    def _centroid_rows(self, backend: str) -> List[sqlite3.Row]:
+        with self._txn(immediate=False) as conn:
+            return conn.execute(
                 """
                 SELECT c.speaker_name, c.sample_type, c.short_name, c.sample_file, c.sample_count,
-                       c.sample_dates_json, c.centroid_blob, c.embedding_dim, c.dtype
+                       c.sample_dates_json, c.centroid_blob, c.embedding_dim, c.dtype, c.normalized
                 FROM voice_embedding_centroids c
                 JOIN voice_embedding_models m ON m.id = c.backend_model_id
                 WHERE m.backend = ? AND m.is_active = 1
@@ -246,10 +433,48 @@ class SqliteVoiceEmbeddingStore:
                 (backend,),
             ).fetchall()
 
+    @staticmethod
+    def _stack_centroid_rows(rows: List[sqlite3.Row]) -> Tuple[List[int], np.ndarray]:
+        """Copy centroid blobs into one contiguous float32 matrix of unit rows.
+
+        Only rows with the first row's dimension fit; their positions in `rows` are returned
+        alongside the matrix. Rows written before the normalized flag are normalized here.
+        """
+        if not rows:
+            return [], np.empty((0, 0), dtype=np.float32)
+        dim = int(rows[0]["embedding_dim"] or 0) or len(rows[0]["centroid_blob"]) // 4
+        kept = [
+            i
+            for i, row in enumerate(rows)
+            if int(row["embedding_dim"] or dim) == dim and len(row["centroid_blob"]) >= dim * 4
+        ]
+        matrix = np.empty((len(kept), dim), dtype=np.float32)
+        for j, i in enumerate(kept):
+            vec = _view_embedding_blob(rows[i]["centroid_blob"], dim)
+            matrix[j] = vec if rows[i]["normalized"] else _unit(vec)
+        return kept, matrix
+
+    def load_centroid_matrix(self, backend: str) -> Tuple[List[str], np.ndarray]:
+        """Active centroids for `backend` as (names, [N, D] float32 matrix of unit rows)."""
+        rows = self._centroid_rows(backend)
+        kept, matrix = self._stack_centroid_rows(rows)
+        return [str(rows[i]["speaker_name"]) for i in kept], matrix
+
+    def load_centroids(self, backend: str) -> Dict[str, Dict[str, Any]]:
+        """Centroids keyed by speaker; each "embedding" is a row view into one shared matrix."""
+        rows = self._centroid_rows(backend)
+        kept, matrix = self._stack_centroid_rows(rows)
+        matrix_row = {i: j for j, i in enumerate(kept)}
+
         result: Dict[str, Dict[str, Any]] = {}
-        for row in rows:
+        for i, row in enumerate(rows):
             speaker_name = str(row["speaker_name"])
-            emb = _unpack_embedding_blob(row["centroid_blob"], int(row["embedding_dim"] or 0))
+            if i in matrix_row:
+                emb = matrix[matrix_row[i]]
+            else:
+                emb = _unpack_embedding_blob(row["centroid_blob"], int(row["embedding_dim"] or 0))
+                if not row["normalized"]:
+                    emb = _unit(emb)
             sample_dates = []
             raw_dates = row["sample_dates_json"]
             if raw_dates:
@@ -260,7 +485,7 @@ class SqliteVoiceEmbeddingStore:
                 except Exception:
                     sample_dates = []
             result[speaker_name] = {
-                "embedding": emb.tolist(),
+                "embedding": emb,
                 "short_name": row["short_name"] or speaker_name.split()[0],
                 "sample_file": row["sample_file"],
                 "sample_count": int(row["sample_count"] or 0),
@@ -271,7 +496,7 @@ class SqliteVoiceEmbeddingStore:
 
     def replace_centroids(self, backend: str, embeddings: Dict[str, Dict[str, Any]]):
         if not embeddings:
-            with self._connect() as conn:
+            with self._txn() as conn:
                 conn.execute(
                     """
                     DELETE FROM voice_embedding_centroids
@@ -285,22 +510,17 @@ class SqliteVoiceEmbeddingStore:
 
         first = next(iter(embeddings.values()))
         dim = len(first.get("embedding", [])) or int(MODEL_META.get(backend, {}).get("embedding_dim", 0))
-        with self._connect() as conn:
+        with self._txn() as conn:
             model_id = self._model_row_id(conn, backend, dim)
             conn.execute("DELETE FROM voice_embedding_centroids WHERE backend_model_id = ?", (model_id,))
             for speaker_name, data in embeddings.items():
                 emb_arr = np.asarray(data.get("embedding", []), dtype=np.float32).flatten()
                 if emb_arr.size == 0:
                     continue
-                blob, emb_dim = _pack_embedding_blob(emb_arr)
+                blob, emb_dim = _pack_embedding_blob(_unit(emb_arr))
                 sample_type = data.get("sample_type") or "speaker"
                 conn.execute(
-                    """
-                    INSERT OR REPLACE INTO voice_embedding_centroids
-                        (speaker_name, sample_type, short_name, sample_file, sample_count, sample_dates_json,
-                         centroid_blob, embedding_dim, dtype, backend_model_id, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'float32', ?, datetime('now', 'localtime'))
-                    """,
+                    self._SQL_INSERT_CENTROID,
                     (
                         speaker_name,
                         sample_type,
@@ -327,7 +547,10 @@ class SqliteVoiceEmbeddingStore:
 
     def export_centroids_to_json(self, backend: str) -> Dict[str, Any]:
         """Return centroids as a JSON-serialisable dict matching the legacy embeddings file format."""
-        centroids = self.load_centroids(backend)
+        centroids = {
+            name: {**data, "embedding": data["embedding"].tolist()}
+            for name, data in self.load_centroids(backend).items()
+        }
         return {
             "meta": {
                 "backend": backend,
@@ -378,62 +601,77 @@ class SqliteVoiceEmbeddingStore:
         end_time: Optional[float],
         source: str,
     ):
-        blob, dim = _pack_embedding_blob(embedding)
-        norm = float(np.linalg.norm(np.asarray(embedding, dtype=np.float32)))
-        sample_key = self._sample_key(
-            backend,
-            speaker_name,
-            sample_type,
-            file_path,
-            episode_id,
-            segment_idx,
-            start_time,
-            end_time,
-            voice_sample_id,
+        self.upsert_sample_embeddings(
+            [
+                {
+                    "backend": backend,
+                    "speaker_name": speaker_name,
+                    "embedding": embedding,
+                    "sample_type": sample_type,
+                    "voice_sample_id": voice_sample_id,
+                    "episode_id": episode_id,
+                    "segment_idx": segment_idx,
+                    "file_path": file_path,
+                    "sample_date": sample_date,
+                    "start_time": start_time,
+                    "end_time": end_time,
+                    "source": source,
+                }
+            ]
         )
-        with self._connect() as conn:
-            model_id = self._model_row_id(conn, backend, dim)
-            conn.execute(
-                """
-                INSERT INTO voice_embedding_samples
-                    (sample_key, speaker_name, sample_type, voice_sample_id, episode_id, segment_idx,
-                     file_path, sample_date, start_time, end_time, source, backend_model_id,
-                     embedding_blob, embedding_norm, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now', 'localtime'))
-                ON CONFLICT(sample_key) DO UPDATE SET
-                    voice_sample_id = excluded.voice_sample_id,
-                    episode_id = excluded.episode_id,
-                    segment_idx = excluded.segment_idx,
-                    file_path = excluded.file_path,
-                    sample_date = excluded.sample_date,
-                    start_time = excluded.start_time,
-                    end_time = excluded.end_time,
-                    source = excluded.source,
-                    backend_model_id = excluded.backend_model_id,
-                    embedding_blob = excluded.embedding_blob,
-                    embedding_norm = excluded.embedding_norm,
-                    updated_at = datetime('now', 'localtime')
-                """,
+
+    def upsert_sample_embeddings(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Upsert many sample embeddings in one transaction. Returns the row count.
+
+        Each row takes the keyword arguments of upsert_sample_embedding.
+        """
+        with self._txn() as conn:
+            return self._upsert_many(conn, rows)
+
+    def _upsert_many(self, conn: sqlite3.Connection, rows: Iterable[Dict[str, Any]]) -> int:
+        model_ids: Dict[Tuple[str, int], int] = {}
+        params = []
+        for row in rows:
+            # Store the unit vector so cosine is a plain dot product; keep the raw norm for reference
+            norm = float(np.linalg.norm(np.asarray(row["embedding"], dtype=np.float32)))
+            blob, dim = _pack_embedding_blob(_unit(row["embedding"]))
+            backend = row["backend"]
+            if (backend, dim) not in model_ids:
+                model_ids[(backend, dim)] = self._model_row_id(conn, backend, dim)
+            sample_key = self._sample_key(
+                backend,
+                row["speaker_name"],
+                row["sample_type"],
+                row.get("file_path"),
+                row.get("episode_id"),
+                row.get("segment_idx"),
+                row.get("start_time"),
+                row.get("end_time"),
+                row.get("voice_sample_id"),
+            )
+            params.append(
                 (
                     sample_key,
-                    speaker_name,
-                    sample_type,
-                    voice_sample_id,
-                    episode_id,
-                    segment_idx,
-                    file_path,
-                    sample_date,
-                    start_time,
-                    end_time,
-                    source,
-                    model_id,
+                    row["speaker_name"],
+                    row["sample_type"],
+                    row.get("voice_sample_id"),
+                    row.get("episode_id"),
+                    row.get("segment_idx"),
+                    row.get("file_path"),
+                    row.get("sample_date"),
+                    row.get("start_time"),
+                    row.get("end_time"),
+                    row.get("source", "manual"),
+                    model_ids[(backend, dim)],
                     blob,
                     norm,
-                ),
+                )
             )
+        conn.executemany(self._SQL_UPSERT_SAMPLE, params)
+        return len(params)
 
     def delete_speaker(self, backend: str, speaker_name: str):
-        with self._connect() as conn:
+        with self._txn() as conn:
             conn.execute(
                 """
                 DELETE FROM voice_embedding_samples
@@ -452,7 +690,7 @@ class SqliteVoiceEmbeddingStore:
             )
 
     def clear_speaker_samples(self, backend: str, speaker_name: str):
-        with self._connect() as conn:
+        with self._txn() as conn:
             conn.execute(
                 """
                 DELETE FROM voice_embedding_samples
@@ -463,7 +701,7 @@ class SqliteVoiceEmbeddingStore:
             )
 
     def rebuild_centroids_from_samples(self, backend: str) -> Dict[str, int]:
-        with self._connect() as conn:
+        with self._txn() as conn:
             rows = conn.execute(
                 """
                 SELECT
@@ -473,6 +711,7 @@ class SqliteVoiceEmbeddingStore:
                     s.sample_date,
                     s.file_path,
                     s.embedding_blob,
+                    s.normalized,
                     m.embedding_dim
                 FROM voice_embedding_samples s
                 JOIN voice_embedding_models m ON m.id = s.backend_model_id
@@ -508,17 +747,26 @@ class SqliteVoiceEmbeddingStore:
                 state = grouped.setdefault(
                     key,
                     {
-                        "vectors": [],
+                        "sum": None,
+                        "count": 0,
                         "sample_dates": [],
                         "sample_file": None,
                         "dim": int(row["embedding_dim"] or 0),
                     },
                 )
 
-                vec = _unpack_embedding_blob(row["embedding_blob"], int(row["embedding_dim"] or 0))
+                # Accumulate straight from the blob view; no per-sample copy or stacking
+                vec = _view_embedding_blob(row["embedding_blob"], state["dim"])
                 if vec.size == 0:
                     continue
-                state["vectors"].append(vec)
+                if not row["normalized"]:
+                    vec = _unit(vec)
+                if state["sum"] is None:
+                    state["sum"] = np.zeros(vec.shape[0], dtype=np.float32)
+                elif vec.shape[0] != state["sum"].shape[0]:
+                    continue
+                state["sum"] += vec
+                state["count"] += 1
 
                 sample_date = row["sample_date"]
                 if sample_date:
@@ -531,37 +779,23 @@ class SqliteVoiceEmbeddingStore:
 
             written = 0
             for (model_id, speaker_name, sample_type), state in grouped.items():
-                vectors: List[np.ndarray] = state["vectors"]
-                if not vectors:
+                if not state["count"]:
                     continue
 
-                centroid = np.mean(np.stack(vectors, axis=0), axis=0).astype(np.float32)
+                # Mean of unit vectors, re-normalized once so the centroid is unit length too
+                centroid = _unit(state["sum"])
                 blob, emb_dim = _pack_embedding_blob(centroid)
                 short_name = speaker_name.split()[0] if speaker_name.split() else speaker_name
                 sample_dates = state["sample_dates"][-100:]
 
                 conn.execute(
-                    """
-                    INSERT INTO voice_embedding_centroids
-                        (speaker_name, sample_type, short_name, sample_file, sample_count,
-                         sample_dates_json, centroid_blob, embedding_dim, dtype, backend_model_id, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'float32', ?, datetime('now', 'localtime'))
-                    ON CONFLICT(speaker_name, sample_type, backend_model_id) DO UPDATE SET
-                        short_name = excluded.short_name,
-                        sample_file = excluded.sample_file,
-                        sample_count = excluded.sample_count,
-                        sample_dates_json = excluded.sample_dates_json,
-                        centroid_blob = excluded.centroid_blob,
-                        embedding_dim = excluded.embedding_dim,
-                        dtype = excluded.dtype,
-                        updated_at = datetime('now', 'localtime')
-                    """,
+                    self._SQL_INSERT_CENTROID,
                     (
                         speaker_name,
                         sample_type,
                         short_name,
                         state["sample_file"],
-                        len(vectors),
+                        state["count"],
                         json.dumps(sample_dates),
                         blob,
                         emb_dim,
@@ -577,7 +811,7 @@ class SqliteVoiceEmbeddingStore:
             }
 
     def verify_integrity(self, backend: str) -> Dict[str, Any]:
-        with self._connect() as conn:
+        with self._txn(immediate=False) as conn:
             sample_row = conn.execute(
                 """
                 SELECT COUNT(*) AS c
@@ -716,11 +950,17 @@ class VoiceLibrary:
         self.embeddings: Dict[str, Dict[str, Any]] = {}
         self.model = None
         self.inference = None
+        self.device = None  # Chosen in _init_model (CUDA when available)
+        self._copy_stream = None  # Side CUDA stream for host-to-device batch copies
         self.hf_token = hf_token
         self.stored_backend = backend
         self.db_path = Path(db_path) if db_path else DEFAULT_DB_PATH
         self.store_mode = store_mode
         self.sqlite_store: Optional[SqliteVoiceEmbeddingStore] = None
+        # dim -> (names, row-normalized float32 matrix, mean sample-date ordinals)
+        self._matrices: Optional[Dict[int, Tuple[List[str], np.ndarray, np.ndarray]]] = None
+        self._resamplers: Dict[Tuple[int, str], Any] = {}
+        self._pending_samples: Optional[List[Dict[str, Any]]] = None  # Set inside batched_samples()
         self._init_store(quiet=quiet)
         self._load_embeddings(quiet=quiet)
 
@@ -748,8 +988,110 @@ class VoiceLibrary:
             return EMBEDDINGS_ECAPA_FILE
         return EMBEDDINGS_PYANNOTE_FILE
 
+    def _embeddings_matrix_files(self, backend: Optional[str] = None) -> Tuple[Path, Path]:
+        """(matrix .npy, metadata .json) paths for the binary file store."""
+        b = backend or self.backend
+        if b == BACKEND_ECAPA:
+            return EMBEDDINGS_ECAPA_NPY, EMBEDDINGS_ECAPA_METADATA
+        return EMBEDDINGS_PYANNOTE_NPY, EMBEDDINGS_PYANNOTE_METADATA
+
+    def _read_matrix_store(self) -> Optional[Dict[str, Any]]:
+        """Load the binary file store into the legacy {"meta", "speakers"} shape, or None if absent.
+
+        The matrix is memory-mapped read-only and each speaker's "embedding" is
+        a row view into it, so commands that only touch metadata (list, info)
+        never page the vectors in, and concurrent CLI processes share the
+        page cache instead of each holding a parsed copy. Rows are float16 on
+        disk; consumers upcast to float32 and re-normalize before scoring.
+        """
+        npy_path, meta_path = self._embeddings_matrix_files()
+        if not meta_path.exists():
+            return None
+        with open(meta_path) as f:
+            metadata = json.load(f)
+        speakers_meta = metadata.get("speakers", {})
+        names = metadata.get("names", list(speakers_meta))
+        if npy_path.exists():
+            matrix = np.load(npy_path, mmap_mode="r")
+        elif npy_path.with_suffix(".npz").exists():
+            # Compressed archive from the first binary layout; it can't be mapped
+            with np.load(npy_path.with_suffix(".npz")) as npz:
+                names = [str(n) for n in npz["names"]]
+                matrix = npz["matrix"]
+        else:
+            return None
+        speakers = {}
+        for i, name in enumerate(names):
+            speakers[name] = {**speakers_meta.get(name, {}), "embedding": matrix[i]}
+        return {"meta": metadata.get("meta", {}), "speakers": speakers}
+
+    def _write_matrix_store(self, meta: Dict[str, Any]):
+        npy_path, meta_path = self._embeddings_matrix_files()
+        names = list(self.embeddings.keys())
+        if names:
+            matrix = np.vstack([np.asarray(self.embeddings[n]["embedding"], dtype=np.float16).ravel() for n in names])
+        else:
+            matrix = np.zeros((0, int(MODEL_META[self.backend]["embedding_dim"])), dtype=np.float16)
+        speakers_meta = {
+            name: {k: v for k, v in data.items() if k != "embedding"} for name, data in self.embeddings.items()
+        }
+        # Write-then-rename: other processes may have the old matrix mapped, and
+        # truncating a mapped file in place would fault their reads
+        npy_tmp = npy_path.with_name(npy_path.name + ".tmp")
+        with open(npy_tmp, "wb") as f:
+            np.save(f, matrix)
+        meta_tmp = meta_path.with_name(meta_path.name + ".tmp")
+        with open(meta_tmp, "w") as f:
+            json.dump({"meta": meta, "names": names, "speakers": speakers_meta}, f, indent=2)
+        os.replace(npy_tmp, npy_path)
+        os.replace(meta_tmp, meta_path)
+
+    def _shards_dir(self) -> Path:
+        return EMBEDDING_SHARDS_DIR / ("ecapa" if self.backend == BACKEND_ECAPA else "pyannote")
+
+    def _shard_path(self, name: str) -> Path:
+        return self._shards_dir() / f"{hashlib.sha1(name.encode('utf-8')).hexdigest()}.npz"
+
+    def _write_shard(self, name: str):
+        """Atomically write one speaker's centroid and metadata as its own shard."""
+        data = self.embeddings[name]
+        path = self._shard_path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {k: v for k, v in data.items() if k != "embedding"}
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                name=np.array(name),
+                embedding=np.asarray(data["embedding"], dtype=np.float16).ravel(),
+                meta=np.array(json.dumps(meta)),
+            )
+        os.replace(tmp, path)
+
+    def _read_shards(self) -> Dict[str, Dict[str, Any]]:
+        shards_dir = self._shards_dir()
+        if not shards_dir.exists():
+            return {}
+        speakers = {}
+        for path in sorted(shards_dir.glob("*.npz")):
+            with np.load(path) as shard:
+                speakers[str(shard["name"])] = {
+                    **json.loads(str(shard["meta"])),
+                    "embedding": shard["embedding"],
+                }
+        return speakers
+
+    def _compact_file_store(self, meta: Dict[str, Any]):
+        """Rewrite the full matrix store, then drop the shards it now covers."""
+        self._write_matrix_store(meta)
+        shards_dir = self._shards_dir()
+        if shards_dir.exists():
+            for path in shards_dir.glob("*.npz"):
+                path.unlink()
+
     def _load_embeddings(self, quiet: bool = False):
         """Load saved embeddings for the active backend from disk."""
+        self._matrices = None
         if self.sqlite_store is not None:
             try:
                 loaded = self.sqlite_store.load_centroids(self.backend)
@@ -773,15 +1115,22 @@ class VoiceLibrary:
         if self.store_mode == STORE_SQLITE:
             return
         target = self._embeddings_file()
-        data = None
+        data = self._read_matrix_store()
 
-        if target.exists():
+        # Fall back to the JSON files; the next save rewrites them as .npy
+        if data is None and target.exists():
             with open(target) as f:
                 data = json.load(f)
-        elif self.backend == BACKEND_PYANNOTE and LEGACY_EMBEDDINGS_FILE.exists():
+        elif data is None and self.backend == BACKEND_PYANNOTE and LEGACY_EMBEDDINGS_FILE.exists():
             with open(LEGACY_EMBEDDINGS_FILE) as f:
                 data = json.load(f)
 
+        # Shards hold speakers added since the last compaction and win over the matrix
+        shards = self._read_shards()
+        if shards:
+            data = data or {"meta": {"backend": self.backend}}
+            data["speakers"] = {**data.get("speakers", {}), **shards}
+
         if data:
             self.embeddings = data.get("speakers", {})
             self.stored_backend = data.get("meta", {}).get("backend", self.backend)
@@ -793,19 +1142,26 @@ class VoiceLibrary:
                     file=sys.stderr,
                 )
 
-    def _save_embeddings(self):
-        """Save embeddings to backend-specific storage."""
-        # Write JSON only in explicit json mode, or auto mode without a sqlite store available
+    def _save_embeddings(self, changed: Optional[List[str]] = None):
+        """Save embeddings to backend-specific storage.
+
+        `changed` names the only speakers added or updated since the last save;
+        the file store then writes just their shards instead of the whole
+        matrix. Without it (or after removals) the file store is compacted.
+        """
+        self._matrices = None
+        # Write the file store only in explicit json mode, or auto mode without a sqlite store available
         if self.store_mode == STORE_JSON or (self.store_mode == STORE_AUTO and self.sqlite_store is None):
-            payload = {
-                "meta": {
-                    "backend": self.backend,
-                    "updated_at": datetime.utcnow().isoformat() + "Z",
-                },
-                "speakers": self.embeddings,
-            }
-            with open(self._embeddings_file(), "w") as f:
-                json.dump(payload, f, indent=2)
+            if changed is not None and all(name in self.embeddings for name in changed):
+                for name in changed:
+                    self._write_shard(name)
+            else:
+                self._compact_file_store(
+                    {
+                        "backend": self.backend,
+                        "updated_at": datetime.utcnow().isoformat() + "Z",
+                    }
+                )
         if self.sqlite_store is not None:
             self.sqlite_store.replace_centroids(self.backend, self.embeddings)
 
@@ -814,23 +1170,88 @@ class VoiceLibrary:
         if self.model is not None:
             return
 
+        if self.backend == BACKEND_ECAPA and not ECAPA_AVAILABLE:
+            raise RuntimeError("speechbrain not available")
+        if self.backend == BACKEND_PYANNOTE:
+            if not PYANNOTE_AVAILABLE:
+                raise RuntimeError("pyannote.audio not available")
+            if not self.hf_token:
+                raise RuntimeError("HuggingFace token required for pyannote speaker embeddings")
+
+        _lazy_import_models()
+        # The library only ever runs inference; skip autograd bookkeeping everywhere
+        torch.set_grad_enabled(False)
+        if torch.cuda.is_available():
+            self._copy_stream = torch.cuda.Stream()
+
         if self.backend == BACKEND_ECAPA:
-            if not ECAPA_AVAILABLE:
-                raise RuntimeError("speechbrain not available")
+            self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
             cache_dir = str(LIBRARY_DIR / "models" / "speechbrain_ecapa")
-            self.model = SpeakerRecognition.from_hparams(
-                source="speechbrain/spkrec-ecapa-voxceleb",
-                savedir=cache_dir,
-            )
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                self.model = SpeakerRecognition.from_hparams(
+                    source="speechbrain/spkrec-ecapa-voxceleb",
+                    savedir=cache_dir,
+                    run_opts={"device": str(self.device)},
+                )
             return
 
-        if not PYANNOTE_AVAILABLE:
-            raise RuntimeError("pyannote.audio not available")
-        if not self.hf_token:
-            raise RuntimeError("HuggingFace token required for pyannote speaker embeddings")
-
-        self.model = Model.from_pretrained("pyannote/embedding", use_auth_token=self.hf_token)
-        self.inference = Inference(self.model, window="whole")
+        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        with warnings.catch_warnings():
+            # Checkpoint version-mismatch chatter from pyannote/lightning
+            warnings.simplefilter("ignore")
+            self.model = Model.from_pretrained("pyannote/embedding", use_auth_token=self.hf_token)
+        self.model.to(self.device).eval()
+        self.inference = Inference(self.model, window="whole", device=self.device)
+
+    def _inference_context(self) -> contextlib.ExitStack:
+        """inference_mode for embedding forwards, plus fp16 autocast on CUDA."""
+        stack = contextlib.ExitStack()
+        stack.enter_context(torch.inference_mode())
+        if self.device is not None and self.device.type == "cuda":
+            stack.enter_context(torch.autocast(device_type="cuda", dtype=torch.float16))
+        return stack
+
+    def _to_16k(self, waveform, sample_rate: int):
+        """Resample to 16 kHz.
+
+        CPU tensors go through soxr when installed (faster than torchaudio and
+        without its per-length kernel caching); otherwise one torchaudio
+        Resample transform is reused per (rate, device).
+        """
+        if SOXR_AVAILABLE and waveform.device.type == "cpu":
+            frames = np.ascontiguousarray(waveform.numpy().T)
+            out = soxr.resample(frames, sample_rate, 16000, quality="HQ")
+            return torch.from_numpy(np.ascontiguousarray(out.T))
+
+        key = (sample_rate, str(waveform.device))
+        resampler = self._resamplers.get(key)
+        if resampler is None:
+            resampler = torchaudio.transforms.Resample(sample_rate, 16000).to(waveform.device)
+            self._resamplers[key] = resampler
+        return resampler(waveform)
+
+    def _load_audio(self, audio_path: Union[str, Path]):
+        """Decode audio to a (channels, samples) float32 tensor and its sample rate.
+
+        Tries soundfile, then miniaudio (MP3 on older libsndfile builds), and
+        only falls back to torchaudio's backends for anything neither decodes.
+        """
+        path = str(audio_path)
+        if SOUNDFILE_AVAILABLE:
+            try:
+                data, sample_rate = sf.read(path, dtype="float32", always_2d=True)
+                return torch.from_numpy(np.ascontiguousarray(data.T)), int(sample_rate)
+            except Exception:
+                pass
+        if MINIAUDIO_AVAILABLE:
+            try:
+                decoded = miniaudio.decode_file(path, output_format=miniaudio.SampleFormat.FLOAT32)
+                data = np.frombuffer(decoded.samples, dtype=np.float32).reshape(-1, decoded.nchannels)
+                return torch.from_numpy(np.ascontiguousarray(data.T)), int(decoded.sample_rate)
+            except Exception:
+                pass
+        return torchaudio.load(path)
 
     def extract_embedding(
         self,
@@ -841,15 +1262,12 @@ class VoiceLibrary:
         """Extract voice embedding from an audio file or segment."""
         self._init_model()
 
-        waveform, sample_rate = torchaudio.load(str(audio_path))
+        waveform, sample_rate = self._load_audio(audio_path)
+        waveform = _downmix(waveform)
         if sample_rate != 16000:
-            resampler = torchaudio.transforms.Resample(sample_rate, 16000)
-            waveform = resampler(waveform)
+            waveform = self._to_16k(waveform, sample_rate)
             sample_rate = 16000
 
-        if waveform.shape[0] > 1:
-            waveform = waveform.mean(dim=0, keepdim=True)
-
         if start_time is not None and end_time is not None:
             start_sample = int(start_time * sample_rate)
             end_sample = min(int(end_time * sample_rate), waveform.shape[1])
@@ -859,12 +1277,29 @@ class VoiceLibrary:
                 f"({waveform.shape[1] / sample_rate:.2f}s)"
             )
 
-        if self.backend == BACKEND_ECAPA:
-            emb = self.model.encode_batch(waveform)
-            return emb.squeeze().detach().cpu().numpy().flatten()
+        with self._inference_context():
+            if self.backend == BACKEND_ECAPA:
+                emb = self.model.encode_batch(waveform)
+                return emb.squeeze().detach().float().cpu().numpy().flatten()
+
+            emb = self.inference({"waveform": waveform, "sample_rate": 16000})
+        return emb.flatten().astype(np.float32)
+
+    @contextlib.contextmanager
+    def batched_samples(self):
+        """Defer add_speaker's writes until the block ends.
 
-        emb = self.inference({"waveform": waveform, "sample_rate": 16000})
-        return emb.flatten()
+        Sample rows go to SQLite in one upsert_sample_embeddings() transaction
+        and the centroids are saved once, instead of once per audio file.
+        """
+        self._pending_samples = []
+        try:
+            yield
+        finally:
+            samples, self._pending_samples = self._pending_samples, None
+            if samples and self.sqlite_store is not None:
+                self.sqlite_store.upsert_sample_embeddings(samples)
+            self._save_embeddings()
 
     def add_speaker(
         self,
@@ -894,23 +1329,27 @@ class VoiceLibrary:
             resolved_sample_type = _resolve_sample_type(sample_type, audio_path, file_path)
 
             if self.sqlite_store is not None:
-                self.sqlite_store.upsert_sample_embedding(
-                    backend=self.backend,
-                    speaker_name=name,
-                    embedding=new_embedding,
-                    sample_type=resolved_sample_type,
-                    voice_sample_id=voice_sample_id,
-                    episode_id=episode_id,
-                    segment_idx=segment_idx,
-                    file_path=file_path or str(audio_path),
-                    sample_date=normalized_sample_date,
-                    start_time=start_time,
-                    end_time=end_time,
-                    source="manual",
-                )
+                sample = {
+                    "backend": self.backend,
+                    "speaker_name": name,
+                    "embedding": new_embedding,
+                    "sample_type": resolved_sample_type,
+                    "voice_sample_id": voice_sample_id,
+                    "episode_id": episode_id,
+                    "segment_idx": segment_idx,
+                    "file_path": file_path or str(audio_path),
+                    "sample_date": normalized_sample_date,
+                    "start_time": start_time,
+                    "end_time": end_time,
+                    "source": "manual",
+                }
+                if self._pending_samples is not None:
+                    self._pending_samples.append(sample)
+                else:
+                    self.sqlite_store.upsert_sample_embedding(**sample)
 
             if name in self.embeddings and update_existing:
-                existing = np.array(self.embeddings[name]["embedding"])
+                existing = np.asarray(self.embeddings[name]["embedding"], dtype=np.float32)
                 if existing.shape != new_embedding.shape:
                     print(
                         f"Shape mismatch for {name}: {existing.shape} vs {new_embedding.shape}; resetting embedding"
@@ -918,9 +1357,10 @@ class VoiceLibrary:
                     update_existing = False
 
             if name in self.embeddings and update_existing:
-                existing = np.array(self.embeddings[name]["embedding"])
+                existing = np.asarray(self.embeddings[name]["embedding"], dtype=np.float32)
                 sample_count = self.embeddings[name].get("sample_count", 1)
-                combined = (existing * sample_count + new_embedding) / (sample_count + 1)
+                # Average directions, matching the unit-length centroids the SQLite store rebuilds
+                combined = _unit(_unit(existing) * sample_count + _unit(new_embedding))
                 self.embeddings[name]["embedding"] = combined.tolist()
                 self.embeddings[name]["sample_count"] = sample_count + 1
                 if normalized_sample_date:
@@ -930,7 +1370,7 @@ class VoiceLibrary:
                 print(f"✓ Updated {name}'s embedding (now {sample_count + 1} samples)")
             else:
                 self.embeddings[name] = {
-                    "embedding": new_embedding.tolist(),
+                    "embedding": _unit(new_embedding).tolist(),
                     "short_name": short_name or name.split()[0],
                     "sample_file": str(audio_path.name),
                     "sample_count": 1,
@@ -938,7 +1378,8 @@ class VoiceLibrary:
                 }
                 print(f"✓ Added {name} to voice library")
 
-            self._save_embeddings()
+            if self._pending_samples is None:
+                self._save_embeddings(changed=[name])
             return True
         except Exception as e:
             print(f"Error extracting embedding: {e}")
@@ -973,18 +1414,27 @@ class VoiceLibrary:
         avg_ordinal = sum(d.toordinal() for d in parsed) // len(parsed)
         return date.fromordinal(avg_ordinal)
 
-    def _temporal_weight(self, sample_dates: List[str], target_date: Optional[str]) -> float:
-        if not target_date or not sample_dates:
-            return 1.0
-        try:
-            target = datetime.strptime(target_date, "%Y-%m-%d").date()
-        except (ValueError, TypeError):
-            return 1.0
-        avg = self._mean_date(sample_dates)
-        if avg is None:
-            return 1.0
-        days_diff = abs((target - avg).days)
-        return 0.5 + 0.5 * math.exp(-days_diff / 365.0)
+    def _library_matrices(self) -> Dict[int, Tuple[List[str], np.ndarray, np.ndarray]]:
+        """Stack library embeddings into row-normalized float32 matrices, one per dimension.
+
+        Built on first use and dropped whenever the library is loaded or saved.
+        """
+        if self._matrices is None:
+            groups: Dict[int, Tuple[List[str], List[np.ndarray], List[float]]] = {}
+            for name, data in self.embeddings.items():
+                vec = np.asarray(data["embedding"], dtype=np.float32).ravel()
+                names, rows, ordinals = groups.setdefault(vec.shape[0], ([], [], []))
+                mean = self._mean_date(data.get("sample_dates", []))
+                names.append(name)
+                rows.append(vec)
+                ordinals.append(float(mean.toordinal()) if mean else np.nan)
+
+            self._matrices = {}
+            for dim, (names, rows, ordinals) in groups.items():
+                matrix = np.vstack(rows)
+                matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+                self._matrices[dim] = (names, matrix, np.asarray(ordinals, dtype=np.float64))
+        return self._matrices
 
     def identify_speaker(
         self,
@@ -995,58 +1445,184 @@ class VoiceLibrary:
         if not self.embeddings:
             return None, 0.0
 
-        best_match = None
-        best_score = -1.0
-
-        for name, data in self.embeddings.items():
-            known_embedding = np.array(data["embedding"])
-            if known_embedding.shape != embedding.shape:
-                continue
-
-            similarity = np.dot(embedding, known_embedding) / (
-                np.linalg.norm(embedding) * np.linalg.norm(known_embedding)
-            )
-            weight = self._temporal_weight(data.get("sample_dates", []), target_date)
-            adjusted = float(similarity * weight)
+        query = np.asarray(embedding, dtype=np.float32).ravel()
+        group = self._library_matrices().get(query.shape[0])
+        if group is None:
+            return None, 0.0
+        names, matrix, mean_ordinals = group
 
-            if adjusted > best_score:
-                best_score = adjusted
-                best_match = name
+        query = query / (np.linalg.norm(query) + 1e-12)
+        weights = self._date_weights(mean_ordinals, target_date)
 
+        if NUMBA_AVAILABLE and len(names) < SMALL_LIBRARY_SIZE:
+            best, best_score = _weighted_cos_argmax(matrix, query, weights)
+            best_score = float(best_score)
+        else:
+            scores = (matrix @ query) * weights
+            best = int(scores.argmax())
+            best_score = float(scores[best])
         if best_score >= threshold:
-            return best_match, best_score
+            return names[best], best_score
         return None, max(0.0, best_score)
 
+    def identify_speakers(
+        self,
+        embeddings: np.ndarray,
+        threshold: float = 0.5,
+        target_date: Optional[str] = None,
+    ) -> List[Tuple[Optional[str], float]]:
+        """identify_speaker for a (B, D) stack of queries, scored with one matrix product."""
+        queries = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        group = self._library_matrices().get(queries.shape[1]) if self.embeddings else None
+        if group is None:
+            return [(None, 0.0)] * queries.shape[0]
+        names, matrix, mean_ordinals = group
+
+        queries = queries / (np.linalg.norm(queries, axis=1, keepdims=True) + 1e-12)
+        scores = (queries @ matrix.T) * self._date_weights(mean_ordinals, target_date)
+        best = scores.argmax(axis=1)
+        results: List[Tuple[Optional[str], float]] = []
+        for row, idx in enumerate(best):
+            best_score = float(scores[row, idx])
+            results.append((names[idx], best_score) if best_score >= threshold else (None, max(0.0, best_score)))
+        return results
+
+    @staticmethod
+    def _date_weights(mean_ordinals: np.ndarray, target_date: Optional[str]) -> np.ndarray:
+        """Per-speaker score multipliers for an episode date (all 1.0 without one)."""
+        weights = np.ones(len(mean_ordinals))
+        if target_date:
+            try:
+                target = datetime.strptime(target_date, "%Y-%m-%d").date().toordinal()
+            except (ValueError, TypeError):
+                return weights
+            # Down-weight speakers whose samples are far from the episode date
+            # (0.5..1.0); speakers without sample dates keep 1.0
+            decay = 0.5 + 0.5 * np.exp(-np.abs(target - mean_ordinals) / 365.0)
+            weights = np.where(np.isnan(mean_ordinals), 1.0, decay)
+        return weights
+
     def _extract_segment_embedding(self, segment_audio) -> Optional[np.ndarray]:
+        try:
+            with self._inference_context():
+                if self.backend == BACKEND_ECAPA:
+                    emb = self.model.encode_batch(segment_audio)
+                    return emb.squeeze().detach().float().cpu().numpy().flatten()
+                emb = self.inference({"waveform": segment_audio, "sample_rate": 16000})
+            return emb.flatten().astype(np.float32)
+        except Exception:
+            return None
+
+    def _embed_speakers(self, segments: List[Any], owners: List[int], num_speakers: int) -> Optional[np.ndarray]:
+        """Mean embedding per speaker from mono 16 kHz (1, T) segments.
+
+        `owners[i]` is the speaker index of `segments[i]`. Segments run in padded
+        batches of EMBED_BATCH_SIZE, in length order so each batch pads to similar
+        lengths, and the next batch is padded (and on CUDA, copied to the GPU on
+        a side stream) by a helper thread while the current one runs through
+        the model. Embeddings are summed per speaker on the model's device, so
+        only the (num_speakers, D) means come back.
+        Rows for speakers without segments are zero. Returns None if a batched
+        call fails so callers can fall back to _extract_segment_embedding.
+        """
+        order = sorted(range(len(segments)), key=lambda i: segments[i].shape[-1])
+        chunks = [order[i : i + EMBED_BATCH_SIZE] for i in range(0, len(order), EMBED_BATCH_SIZE)]
+        owner_ids = torch.as_tensor(owners, dtype=torch.long)
+        counts = torch.bincount(owner_ids, minlength=num_speakers).clamp_(min=1)
+        sums = None
+        with ThreadPoolExecutor(max_workers=1) as pool, torch.inference_mode():
+            pending = pool.submit(self._pad_segments, [segments[i] for i in chunks[0]])
+            for n, chunk in enumerate(chunks):
+                batch, mask, lengths, copied = pending.result()
+                if n + 1 < len(chunks):
+                    pending = pool.submit(self._pad_segments, [segments[i] for i in chunks[n + 1]])
+                if copied is not None:
+                    # Order this batch's upload before its forward; tell the caching
+                    # allocator the tensors are now in use on the compute stream
+                    compute = torch.cuda.current_stream(self.device)
+                    compute.wait_event(copied)
+                    batch.record_stream(compute)
+                    mask.record_stream(compute)
+                emb = self._embed_padded(batch, mask, lengths)
+                if emb is None:
+                    return None
+                if sums is None:
+                    sums = torch.zeros(num_speakers, emb.shape[1], dtype=torch.float32, device=emb.device)
+                sums.index_add_(0, owner_ids[chunk].to(emb.device), emb)
+        return (sums / counts.to(sums.device).unsqueeze(1)).cpu().numpy()
+
+    def _pad_segments(self, segments: List[Any]):
+        """Zero-pad segments into a (B, 1, T) batch plus a (B, T) validity mask.
+
+        On CUDA the batch is built in pinned host memory and uploaded with a
+        non-blocking copy on the side stream; the returned event marks when
+        that copy is done (None on CPU, where the tensors stay on the host).
+        """
+        pinned = self._copy_stream is not None
+        lengths = [int(seg.shape[-1]) for seg in segments]
+        max_len = max(lengths)
+        batch = torch.zeros(len(segments), 1, max_len, dtype=segments[0].dtype, pin_memory=pinned)
+        mask = torch.zeros(len(segments), max_len, pin_memory=pinned)
+        for i, (seg, n) in enumerate(zip(segments, lengths)):
+            batch[i, :, :n] = seg
+            mask[i, :n] = 1.0
+        if not pinned:
+            return batch, mask, lengths, None
+        with torch.cuda.stream(self._copy_stream):
+            batch = batch.to(self.device, non_blocking=True)
+            mask = mask.to(self.device, non_blocking=True)
+            copied = torch.cuda.Event()
+            copied.record()
+        return batch, mask, lengths, copied
+
+    def _embed_padded(self, batch, mask, lengths: List[int]):
+        """One forward over a padded batch; a float32 (B, D) tensor on the model's device.
+
+        Padding is masked out: ECAPA gets relative lengths, pyannote gets
+        per-sample weights for its statistics pooling.
+        """
+        max_len = batch.shape[-1]
+        batch = batch.to(self.device, non_blocking=True)
+        mask = mask.to(self.device, non_blocking=True)
+
         try:
             if self.backend == BACKEND_ECAPA:
-                emb = self.model.encode_batch(segment_audio)
-                return emb.squeeze().detach().cpu().numpy().flatten()
-            emb = self.inference({"waveform": segment_audio, "sample_rate": 16000})
-            return emb.flatten()
+                rel_lengths = torch.tensor(lengths, dtype=torch.float32) / max_len
+                with self._inference_context():
+                    emb = self.model.encode_batch(batch.squeeze(1), rel_lengths)
+                return emb.squeeze(1).float()
+            with warnings.catch_warnings(), self._inference_context():
+                # StatsPool warns when it resamples sample weights to frames
+                warnings.simplefilter("ignore")
+                emb = self.model(batch, weights=mask)
+            return emb.float()
         except Exception:
             return None
 
     def identify_speakers_in_diarization(
         self,
         diarization_result: Dict[str, Any],
-        audio_path: Path,
+        audio: Union[Path, Dict[str, Any]],
         return_scores: bool = False,
         episode_date: Optional[str] = None,
         progress_callback=None,
     ) -> Dict[str, Any]:
+        """Match diarization labels to library speakers.
+
+        `audio` is either a path to decode or an in-memory
+        {"waveform": tensor, "sample_rate": int} dict, so callers that already
+        loaded the episode (e.g. speaker_diarization) don't decode it twice.
+        """
         if not self.embeddings:
             print("No speakers in voice library")
             return {}
 
         self._init_model()
 
-        waveform, sample_rate = torchaudio.load(str(audio_path))
-        if sample_rate != 16000:
-            resampler = torchaudio.transforms.Resample(sample_rate, 16000)
-            waveform = resampler(waveform)
-        if waveform.shape[0] > 1:
-            waveform = waveform.mean(dim=0, keepdim=True)
+        if isinstance(audio, dict):
+            waveform, sample_rate = audio["waveform"], int(audio["sample_rate"])
+        else:
+            waveform, sample_rate = self._load_audio(audio)
 
         speaker_segments: Dict[str, List[Dict[str, Any]]] = {}
         for seg in diarization_result.get("segments", []):
@@ -1060,26 +1636,58 @@ class VoiceLibrary:
         speaker_labels = list(speaker_segments.keys())
         total = len(speaker_labels)
 
+        # Slice every speaker's segments first so they embed in one forward pass.
+        # Only the chosen segments are downmixed and resampled, not the whole episode.
+        segment_owners: List[int] = []
+        segment_audio: List[Any] = []
         for i, speaker_label in enumerate(speaker_labels):
-            segments = speaker_segments[speaker_label]
-            segments.sort(key=lambda s: s.get("end", 0) - s.get("start", 0), reverse=True)
-            top_segments = segments[:5]
-
-            embeddings = []
-            for seg in top_segments:
-                start_sample = int(seg["start"] * 16000)
-                end_sample = min(int(seg["end"] * 16000), waveform.shape[1])
-                if end_sample - start_sample < 16000:
+            # Longest segments of at least 1s, stopping at 5 or once 30s of audio is covered
+            segments = [s for s in speaker_segments[speaker_label] if s.get("end", 0) - s.get("start", 0) >= 1.0]
+            segments.sort(key=lambda s: s["end"] - s["start"], reverse=True)
+            chosen: List[Dict[str, Any]] = []
+            covered = 0.0
+            for seg in segments:
+                chosen.append(seg)
+                covered += seg["end"] - seg["start"]
+                if covered >= 30.0 or len(chosen) >= 5:
+                    break
+            for seg in chosen:
+                start_sample = int(seg["start"] * sample_rate)
+                end_sample = min(int(seg["end"] * sample_rate), waveform.shape[1])
+                if end_sample <= start_sample:
+                    continue
+                chunk = _downmix(waveform[:, start_sample:end_sample])
+                if sample_rate != 16000:
+                    chunk = self._to_16k(chunk, sample_rate)
+                if chunk.shape[1] < 16000:
                     continue
+                segment_owners.append(i)
+                segment_audio.append(chunk)
 
-                segment_audio = waveform[:, start_sample:end_sample]
-                emb = self._extract_segment_embedding(segment_audio)
+        speaker_embeddings: Dict[int, np.ndarray] = {}
+        means = self._embed_speakers(segment_audio, segment_owners, total) if segment_audio else None
+        if means is not None:
+            speaker_embeddings = {i: means[i] for i in set(segment_owners)}
+        else:
+            grouped: Dict[int, List[np.ndarray]] = {}
+            for owner, audio_chunk in zip(segment_owners, segment_audio):
+                emb = self._extract_segment_embedding(audio_chunk)
                 if emb is not None:
-                    embeddings.append(emb)
+                    grouped.setdefault(owner, []).append(emb)
+            speaker_embeddings = {i: np.mean(embs, axis=0) for i, embs in grouped.items()}
+
+        # Score every diarized speaker against the library in one product
+        scored = sorted(speaker_embeddings)
+        matches: Dict[int, Tuple[Optional[str], float]] = {}
+        if scored:
+            results = self.identify_speakers(
+                np.stack([speaker_embeddings[i] for i in scored]), target_date=episode_date
+            )
+            matches = dict(zip(scored, results))
 
-            if embeddings:
-                avg_embedding = np.mean(embeddings, axis=0)
-                match, score = self.identify_speaker(avg_embedding, target_date=episode_date)
+        for i, speaker_label in enumerate(speaker_labels):
+            if i in matches:
+                match, score = matches[i]
                 speaker_scores[speaker_label] = round(score, 3)
                 if match:
                     speaker_mapping[speaker_label] = match
@@ -1101,14 +1709,19 @@ class VoiceLibrary:
         return speaker_mapping
 
 
+_HF_TOKEN_RE = re.compile(r"""^(?:HF_TOKEN|HUGGINGFACE_TOKEN)\s*=\s*['"]?([^'"\n]+)""")
+
+
+@functools.lru_cache(maxsize=1)
 def get_hf_token():
-    """Get HuggingFace token from .env file or environment."""
+    """Get HuggingFace token from .env file or environment (read once per process)."""
     env_path = Path(__file__).parent.parent / ".env"
     if env_path.exists():
         with open(env_path) as f:
             for line in f:
-                if line.startswith("HF_TOKEN=") or line.startswith("HUGGINGFACE_TOKEN="):
-                    return line.strip().split("=", 1)[1].strip('"\'')
+                m = _HF_TOKEN_RE.match(line)
+                if m:
+                    return m.group(1).strip()
     return os.environ.get("HF_TOKEN") or os.environ.get("HUGGINGFACE_TOKEN")
 
 
@@ -1283,6 +1896,13 @@ def main():
     add_store_args(export_json_parser)
     export_json_parser.add_argument("--output", type=str, default=None, help="Output path (default: embeddings_<backend>.json)")
 
+    compact_parser = subparsers.add_parser(
+        "compact",
+        help="Merge per-speaker embedding shards into the file store's single matrix",
+    )
+    add_backend_arg(compact_parser)
+    add_store_args(compact_parser)
+
     compare_parser = subparsers.add_parser("compare", help="Compare ECAPA and pyannote on one diarized episode")
     compare_parser.add_argument("--diarization-json", required=True, help="Path to transcript or diarization JSON")
     compare_parser.add_argument("--audio", required=True, help="Path to original audio file")
@@ -1321,7 +1941,16 @@ def main():
         print(json.dumps(result, indent=2))
         return
 
-    quiet = args.command in ("info", "rebuild", "rebuild-speaker", "rebuild-from-db", "verify", "migrate-json", "export-json")
+    quiet = args.command in (
+        "info",
+        "rebuild",
+        "rebuild-speaker",
+        "rebuild-from-db",
+        "verify",
+        "migrate-json",
+        "export-json",
+        "compact",
+    )
     db_path = Path(getattr(args, "db_path", str(DEFAULT_DB_PATH)))
     store_mode = getattr(args, "store_mode", STORE_AUTO)
     library = VoiceLibrary(
@@ -1448,26 +2077,27 @@ def main():
         speaker_names = sorted(speaker_files.keys())
         total = len(speaker_names)
 
-        for i, speaker_name in enumerate(speaker_names):
-            audio_files = speaker_files.get(speaker_name, [])
-            if not audio_files:
-                skipped += 1
-                print(f"REBUILD_PROGRESS: {int((i + 1) / max(total, 1) * 100)}", flush=True)
-                continue
+        with library.batched_samples():
+            for i, speaker_name in enumerate(speaker_names):
+                audio_files = speaker_files.get(speaker_name, [])
+                if not audio_files:
+                    skipped += 1
+                    print(f"REBUILD_PROGRESS: {int((i + 1) / max(total, 1) * 100)}", flush=True)
+                    continue
 
-            if speaker_name in library.embeddings:
-                del library.embeddings[speaker_name]
-            if library.sqlite_store is not None:
-                library.sqlite_store.clear_speaker_samples(library.backend, speaker_name)
+                if speaker_name in library.embeddings:
+                    del library.embeddings[speaker_name]
+                if library.sqlite_store is not None:
+                    library.sqlite_store.clear_speaker_samples(library.backend, speaker_name)
 
-            for audio_file in audio_files:
-                ok = library.add_speaker(speaker_name, audio_file, update_existing=True)
-                if ok:
-                    rebuilt += 1
-                else:
-                    errors += 1
+                for audio_file in audio_files:
+                    ok = library.add_speaker(speaker_name, audio_file, update_existing=True)
+                    if ok:
+                        rebuilt += 1
+                    else:
+                        errors += 1
 
-            print(f"REBUILD_PROGRESS: {int((i + 1) / max(total, 1) * 100)}", flush=True)
+                print(f"REBUILD_PROGRESS: {int((i + 1) / max(total, 1) * 100)}", flush=True)
 
         print(
             json.dumps(
@@ -1543,10 +2173,11 @@ def main():
                 if library.sqlite_store is not None:
                     library.sqlite_store.clear_speaker_samples(library.backend, speaker_name)
                 rebuilt = 0
-                for audio_file in audio_files:
-                    ok = library.add_speaker(speaker_name, audio_file, update_existing=True)
-                    if ok:
-                        rebuilt += 1
+                with library.batched_samples():
+                    for audio_file in audio_files:
+                        ok = library.add_speaker(speaker_name, audio_file, update_existing=True)
+                        if ok:
+                            rebuilt += 1
                 print(
                     json.dumps(
                         {
@@ -1643,6 +2274,10 @@ def main():
         out_path = Path(args.output) if getattr(args, "output", None) else library._embeddings_file()
         with open(out_path, "w") as f:
             json.dump(payload, f, indent=2)
+        if out_path.resolve() == library._embeddings_file().resolve():
+            # File mode loads the .npy store ahead of this JSON; rewrite it so it isn't stale
+            library.embeddings = library.sqlite_store.load_centroids(library.backend)
+            library._compact_file_store(payload["meta"])
         print(
             json.dumps(
                 {
@@ -1654,6 +2289,24 @@ def main():
             )
         )
 
+    elif args.command == "compact":
+        if library.sqlite_store is not None:
+            print(json.dumps({"status": "error", "backend": library.backend, "error": "Library uses the SQLite store"}))
+            raise SystemExit(1)
+
+        shard_count = len(list(library._shards_dir().glob("*.npz")))
+        library._save_embeddings()
+        print(
+            json.dumps(
+                {
+                    "status": "success",
+                    "backend": library.backend,
+                    "speaker_count": len(library.embeddings),
+                    "merged_shards": shard_count,
+                }
+            )
+        )
+
 
 if __name__ == "__main__":
     main()
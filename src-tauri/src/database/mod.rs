@@ -779,6 +779,16 @@ Mark the start time of each segment.',
                 ON voice_embedding_centroids(backend_model_id);
             "#,
         )?;
+        // Embedding vectors are written L2-normalized (scripts/voice_library.py);
+        // rows from before this flag existed hold raw vectors.
+        let _ = conn.execute(
+            "ALTER TABLE voice_embedding_samples ADD COLUMN normalized INTEGER NOT NULL DEFAULT 0",
+            [],
+        );
+        let _ = conn.execute(
+            "ALTER TABLE voice_embedding_centroids ADD COLUMN normalized INTEGER NOT NULL DEFAULT 0",
+            [],
+        );
 
         // Pipeline error log — persists across restarts for post-crash debugging
         conn.execute_batch(